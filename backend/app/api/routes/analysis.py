@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.sql import func
 from typing import List, Optional
 import base64
+import hashlib
 import os
+import shutil
 import tempfile
-import subprocess
-import sys
 import logging
 
 from app.core.database import get_db
+from app.core.config import settings
 from app.models.user import User
 from app.models.resume import Resume
 from app.models.analysis import Analysis
@@ -17,8 +19,8 @@ from app.api.routes.auth import get_current_active_user
 
 # Runtime import with fallback
 try:
-    from app.services.ats_analyzer import ATSAnalyzer
-    from app.services.resume_parser import ResumeParser
+    from app.services.ats_analyzer import ats_analyzer
+    from app.services.resume_parser import resume_parser
     ML_SERVICES_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"ML services not available: {e}")
@@ -27,46 +29,11 @@ except ImportError as e:
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Track if ML packages have been installed
-ml_packages_installed = False
-
-def ensure_ml_packages():
-    """Ensure ML packages are installed at runtime."""
-    global ml_packages_installed
-    
-    if ml_packages_installed:
-        return True
-        
-    try:
-        # Try to install required packages
-        packages = ["spacy>=3.4.0", "scikit-learn>=1.0.0", "numpy>=1.21.0", "pandas>=1.3.0"]
-        
-        for package in packages:
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", package], 
-                             check=True, capture_output=True, text=True, timeout=30)
-                logger.info(f"Installed {package}")
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-                logger.warning(f"Failed to install {package}: {e}")
-        
-        # Try to download spaCy model
-        try:
-            subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], 
-                         check=True, capture_output=True, text=True, timeout=60)
-            logger.info("Downloaded spaCy model")
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-            logger.warning("Could not download spaCy model")
-        
-        ml_packages_installed = True
-        return True
-        
-    except Exception as e:
-        logger.error(f"Failed to install ML packages: {e}")
-        return False
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
 
 
 @router.post("/analyze", response_model=AnalysisResponse)
-async def create_analysis(
+def create_analysis(
     job_description: str = Form(...),
     job_title: Optional[str] = Form(None),
     company_name: Optional[str] = Form(None),
@@ -78,30 +45,15 @@ async def create_analysis(
     """
     Analyze resume against job description and return ATS score with detailed feedback
     """
-    global ML_SERVICES_AVAILABLE  # Declare as global to modify module-level variable
-    
-    # Try to ensure ML packages are available
     if not ML_SERVICES_AVAILABLE:
-        logger.info("Attempting to install ML packages at runtime...")
-        if ensure_ml_packages():
-            # Try to import services again
-            try:
-                global ATSAnalyzer, ResumeParser
-                from app.services.ats_analyzer import ATSAnalyzer
-                from app.services.resume_parser import ResumeParser
-                ML_SERVICES_AVAILABLE = True
-                logger.info("ML services now available")
-            except ImportError as e:
-                logger.error(f"Still cannot import ML services: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="Resume analysis services are currently unavailable. Please try again later."
-                )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Resume analysis services are currently unavailable. Please try again later."
-            )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Resume analysis services are currently unavailable. Please try again later."
+        )
+    
+    if resume_file:
+        validate_resume_upload(resume_file)
+    
     # Ensure we have either a file or resume_id
     if not resume_file and not resume_id:
         raise HTTPException(
@@ -131,22 +83,24 @@ async def create_analysis(
     elif resume_file:
         # Process uploaded file
         try:
-            # Save temporary file
-            content = await resume_file.read()
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{resume_file.filename.split('.')[-1]}") as tmp_file:
-                tmp_file.write(content)
-                tmp_file_path = tmp_file.name
+            # Keep the original extension so the parser picks the right extractor
+            suffix = os.path.splitext(resume_file.filename or '')[1] or '.bin'
+            tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+            try:
+                # Stream upload into the temporary file without buffering it in memory
+                with tmp_file:
+                    shutil.copyfileobj(resume_file.file, tmp_file, UPLOAD_CHUNK_SIZE)
+                file_size = os.path.getsize(tmp_file.name)
+                
+                # Parse resume
+                parsed_result = resume_parser.parse_resume(tmp_file.name)
+            finally:
+                # Always clean up the temporary file, even if copying or parsing failed
+                os.unlink(tmp_file.name)
             
-            # Parse resume
-            parser = ResumeParser()
-            parsed_result = parser.parse_resume(tmp_file_path)
             resume_text = parsed_result.get('raw_text', '')
             extracted_info = parsed_result.get('extracted_info')
             
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-            
             # Convert ExtractedInfo to dict for database storage
             parsed_data = {
                 'name': extracted_info.name,
@@ -166,15 +120,14 @@ async def create_analysis(
                 user_id=current_user.id,
                 filename=resume_file.filename,
                 file_path="",  # We're not storing the file permanently
-                file_size=len(content),
+                file_size=file_size,
                 file_type=resume_file.content_type or "application/octet-stream",
                 raw_text=resume_text,
                 parsed_data=parsed_data,
                 is_processed="completed"
             )
+            # Committed together with the analysis below
             db.add(resume_record)
-            db.commit()
-            db.refresh(resume_record)
             
         except Exception as e:
             raise HTTPException(
@@ -190,8 +143,7 @@ async def create_analysis(
     
     # Perform ATS analysis
     try:
-        analyzer = ATSAnalyzer()
-        analysis_result = analyzer.analyze_resume_vs_job(resume_text, job_description)
+        analysis_result = ats_analyzer.analyze_resume_vs_job(resume_text, job_description)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -201,7 +153,7 @@ async def create_analysis(
     # Save analysis to database
     analysis = Analysis(
         user_id=current_user.id,
-        resume_id=resume_record.id if resume_record else None,
+        resume=resume_record,
         job_description=job_description,
         job_title=job_title,
         company_name=company_name,
@@ -225,45 +177,71 @@ async def create_analysis(
 
 
 @router.get("/", response_model=List[AnalysisResponse])
-async def get_user_analyses(
+def get_user_analyses(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get all analyses for the current user
+    Get analyses for the current user, newest first, with pagination
     """
-    analyses = db.query(Analysis).filter(
+    # Analyses are never modified, so the newest entry and the count identify the list
+    count, latest_id, latest_created_at = db.query(
+        func.count(Analysis.id), func.max(Analysis.id), func.max(Analysis.created_at)
+    ).filter(Analysis.user_id == current_user.id).one()
+    
+    etag = build_etag(f"{current_user.id}|{latest_id}|{latest_created_at}|{count}|{skip}|{limit}")
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    analyses = db.query(Analysis).options(
+        defer(Analysis.resume_text)  # Not part of the response
+    ).filter(
         Analysis.user_id == current_user.id
-    ).order_by(Analysis.created_at.desc()).all()
+    ).order_by(Analysis.created_at.desc()).offset(skip).limit(limit).all()
     
     return analyses
 
 
 @router.get("/{analysis_id}", response_model=AnalysisResponse)
-async def get_analysis(
+def get_analysis(
     analysis_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Get specific analysis by ID
     """
-    analysis = db.query(Analysis).filter(
+    created_at = db.query(Analysis.created_at).filter(
         Analysis.id == analysis_id,
         Analysis.user_id == current_user.id
     ).first()
     
-    if not analysis:
+    if not created_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Analysis not found"
         )
     
+    # Analyses are never modified, so id and creation time identify the content
+    etag = build_etag(f"{current_user.id}|{analysis_id}|{created_at[0]}")
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    response.headers["ETag"] = etag
     return analysis
 
 
 @router.delete("/{analysis_id}")
-async def delete_analysis(
+def delete_analysis(
     analysis_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -285,4 +263,39 @@ async def delete_analysis(
     db.delete(analysis)
     db.commit()
     
-    return {"message": "Analysis deleted successfully"}
\ No newline at end of file
+    return {"message": "Analysis deleted successfully"}
+
+
+def validate_resume_upload(resume_file: UploadFile) -> None:
+    """Reject unsupported or oversized resume uploads before reading them.
+    
+    The type is decided by the file extension, as for /resumes/upload, since
+    clients often send application/octet-stream for PDF and Word files.
+    """
+    file_extension = os.path.splitext(resume_file.filename or '')[1].lower()
+    
+    if file_extension not in settings.ALLOWED_RESUME_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type {file_extension} not supported. "
+                   f"Allowed types: {sorted(settings.ALLOWED_RESUME_EXTENSIONS)}"
+        )
+    
+    if resume_file.size is not None and resume_file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
+        )
+
+
+def build_etag(version: str) -> str:
+    """Build a weak ETag from a version string."""
+    return f'W/"{hashlib.md5(version.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
\ No newline at end of file
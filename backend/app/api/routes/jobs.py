@@ -1,17 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func, literal_column
 from typing import List, Optional
 from app.core.database import get_db
 from app.api.routes.auth import get_current_active_user
 from app.models.user import User, UserRole
-from app.models.job import Job
+from app.models.job import Job, JOB_SEARCH_DOCUMENT
 from app.schemas.job import JobCreate, JobUpdate, JobResponse, JobSearch
+from app.services.job_matcher import job_matcher
+from app.api.routes.matching import build_job_match_data
 
 router = APIRouter()
 
 
 @router.post("/", response_model=JobResponse)
-async def create_job(
+def create_job(
     job_data: JobCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -46,11 +50,14 @@ async def create_job(
     db.commit()
     db.refresh(db_job)
     
+    # Precompute matching features for the new posting
+    job_matcher.prepare_job(build_job_match_data(db_job))
+    
     return db_job
 
 
 @router.get("/", response_model=List[JobResponse])
-async def get_jobs(
+def get_jobs(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
@@ -68,12 +75,17 @@ async def get_jobs(
         query = query.filter(Job.is_active == True)
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            Job.title.ilike(search_term) |
-            Job.company.ilike(search_term) |
-            Job.description.ilike(search_term)
-        )
+        if db.get_bind().dialect.name == "postgresql":
+            # Full-text search served by the ix_jobs_search GIN index
+            search_vector = func.to_tsvector('english', literal_column(JOB_SEARCH_DOCUMENT))
+            query = query.filter(search_vector.op('@@')(func.plainto_tsquery('english', search)))
+        else:
+            search_term = f"%{search}%"
+            query = query.filter(
+                Job.title.ilike(search_term) |
+                Job.company.ilike(search_term) |
+                Job.description.ilike(search_term)
+            )
     
     if location:
         query = query.filter(Job.location.ilike(f"%{location}%"))
@@ -91,7 +103,7 @@ async def get_jobs(
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(
+def get_job(
     job_id: int,
     db: Session = Depends(get_db)
 ):
@@ -108,41 +120,50 @@ async def get_job(
 
 
 @router.put("/{job_id}", response_model=JobResponse)
-async def update_job(
+def update_job(
     job_id: int,
     job_data: JobUpdate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Update a job posting."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    update_data = job_data.dict(exclude_unset=True)
     
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    # Update and fetch the job in one statement, limited to postings the user may edit
+    stmt = update(Job).where(Job.id == job_id)
+    if current_user.role != UserRole.ADMIN:
+        stmt = stmt.where(Job.posted_by_id == current_user.id)
+    stmt = stmt.values(**update_data, updated_at=func.now(), version=Job.version + 1).returning(Job)
     
-    # Check permissions
-    if job.posted_by_id != current_user.id and current_user.role != UserRole.ADMIN:
+    job = db.scalars(stmt).first()
+    
+    if not job:
+        job_exists = db.query(db.query(Job.id).filter(Job.id == job_id).exists()).scalar()
+        if not job_exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only update your own job postings"
         )
     
-    # Update job fields
-    update_data = job_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(job, field, value)
+    # Serialize before commit expires the returned row
+    response = JobResponse.model_validate(job)
+    
+    # Drop results cached for earlier versions and precompute matching
+    # features for the updated posting
+    job_matcher.invalidate(job_id=job_id)
+    job_matcher.prepare_job(build_job_match_data(job))
     
     db.commit()
-    db.refresh(job)
     
-    return job
+    return response
 
 
 @router.delete("/{job_id}")
-async def delete_job(
+def delete_job(
     job_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -165,21 +186,26 @@ async def delete_job(
     
     db.delete(job)
     db.commit()
+    job_matcher.invalidate(job_id=job_id)
     
     return {"message": "Job deleted successfully"}
 
 
 @router.get("/my/posted", response_model=List[JobResponse])
-async def get_my_jobs(
+def get_my_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get jobs posted by the current user."""
+    """Get jobs posted by the current user with pagination."""
     if current_user.role not in [UserRole.RECRUITER, UserRole.FACULTY, UserRole.ADMIN]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only recruiters, faculty, and admins can view posted jobs"
         )
     
-    jobs = db.query(Job).filter(Job.posted_by_id == current_user.id).all()
+    jobs = db.query(Job).filter(
+        Job.posted_by_id == current_user.id
+    ).order_by(Job.id.desc()).offset(skip).limit(limit).all()
     return jobs
\ No newline at end of file
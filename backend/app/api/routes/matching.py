@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from sqlalchemy.dialects import postgresql, sqlite
 from typing import List, Optional
 from app.core.database import get_db
 from app.api.routes.auth import get_current_active_user
@@ -7,14 +10,13 @@ from app.models.user import User
 from app.models.job import Job
 from app.models.resume import Resume
 from app.models.application import JobMatch, Application, ApplicationStatus
-from app.services.job_matcher import job_matcher
+from app.services.job_matcher import job_matcher, MatchScore
 from app.schemas.resume import ResumeMatch
 
 router = APIRouter()
 
-
 @router.post("/resume/{resume_id}/job/{job_id}", response_model=ResumeMatch)
-async def match_resume_to_job(
+def match_resume_to_job(
     resume_id: int,
     job_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -49,68 +51,8 @@ async def match_resume_to_job(
             detail="Job not found"
         )
     
-    # Prepare data for matching
-    resume_data = {
-        'skills': resume.skills or [],
-        'experience': resume.experience or [],
-        'education': resume.education or [],
-        'raw_text': resume.raw_text or ''
-    }
-    
-    job_data = {
-        'title': job.title,
-        'description': job.description,
-        'requirements': job.requirements,
-        'required_skills': job.required_skills or [],
-        'preferred_skills': job.preferred_skills or [],
-        'keywords': job.keywords or [],
-        'experience_level': job.experience_level
-    }
-    
-    # Calculate match score
-    match_score = job_matcher.calculate_compatibility_score(resume_data, job_data)
-    
-    # Save or update job match record
-    existing_match = db.query(JobMatch).filter(
-        JobMatch.job_id == job_id,
-        JobMatch.user_id == current_user.id,
-        JobMatch.resume_id == resume_id
-    ).first()
-    
-    if existing_match:
-        # Update existing match
-        existing_match.overall_score = match_score.overall_score
-        existing_match.skill_score = match_score.skill_score
-        existing_match.experience_score = match_score.experience_score
-        existing_match.education_score = match_score.education_score
-        existing_match.keyword_score = match_score.keyword_score
-        existing_match.match_details = {
-            'matched_skills': match_score.matched_skills,
-            'missing_skills': match_score.missing_skills,
-            'strengths': match_score.strengths,
-            'weaknesses': match_score.weaknesses,
-            'recommendations': match_score.recommendations
-        }
-    else:
-        # Create new match
-        new_match = JobMatch(
-            job_id=job_id,
-            user_id=current_user.id,
-            resume_id=resume_id,
-            overall_score=match_score.overall_score,
-            skill_score=match_score.skill_score,
-            experience_score=match_score.experience_score,
-            education_score=match_score.education_score,
-            keyword_score=match_score.keyword_score,
-            match_details={
-                'matched_skills': match_score.matched_skills,
-                'missing_skills': match_score.missing_skills,
-                'strengths': match_score.strengths,
-                'weaknesses': match_score.weaknesses,
-                'recommendations': match_score.recommendations
-            }
-        )
-        db.add(new_match)
+    # Calculate and save match score
+    match_score = compute_and_store_match(db, current_user.id, resume, job)
     
     db.commit()
     
@@ -132,7 +74,7 @@ async def match_resume_to_job(
 
 
 @router.get("/resume/{resume_id}/recommendations", response_model=List[ResumeMatch])
-async def get_job_recommendations(
+def get_job_recommendations(
     resume_id: int,
     limit: int = Query(10, ge=1, le=50),
     min_score: float = Query(50.0, ge=0.0, le=100.0),
@@ -159,59 +101,80 @@ async def get_job_recommendations(
             detail="Resume is still being processed"
         )
     
-    # Get active jobs
-    jobs = db.query(Job).filter(Job.is_active == True).limit(50).all()  # Limit for performance
+    # A stored match is current if it was computed from the current
+    # versions of both the job and the resume
+    # Score only active jobs without a current match (limit for performance)
+    jobs = db.query(Job).outerjoin(
+        JobMatch,
+        and_(
+            JobMatch.job_id == Job.id,
+            JobMatch.user_id == current_user.id,
+            JobMatch.resume_id == resume.id
+        )
+    ).filter(
+        Job.is_active == True,
+        or_(
+            JobMatch.id.is_(None),
+            JobMatch.job_version.is_distinct_from(Job.version),
+            JobMatch.resume_version.is_distinct_from(resume.version)
+        )
+    ).limit(50).all()
+    
+    if jobs:
+        # Calculate match scores for all jobs in one batch and persist them,
+        # so subsequent calls are answered from the database
+        resume_data = build_resume_match_data(resume)
+        jobs_data = [build_job_match_data(job) for job in jobs]
+        match_scores = job_matcher.calculate_compatibility_batch(resume_data, jobs_data)
+        
+        for job, match_score in zip(jobs, match_scores):
+            upsert_job_match(db, job, current_user.id, resume, match_score)
+        db.commit()
+    
+    # Rank stored matches above the minimum score
+    rows = db.query(
+        JobMatch.job_id,
+        Job.title,
+        Job.company,
+        JobMatch.overall_score,
+        JobMatch.skill_score,
+        JobMatch.experience_score,
+        JobMatch.education_score,
+        JobMatch.keyword_score,
+        JobMatch.match_details
+    ).join(
+        Job, Job.id == JobMatch.job_id
+    ).filter(
+        JobMatch.user_id == current_user.id,
+        JobMatch.resume_id == resume.id,
+        JobMatch.overall_score >= min_score,
+        Job.is_active == True
+    ).order_by(JobMatch.overall_score.desc()).limit(limit).all()
     
     recommendations = []
-    
-    # Prepare resume data
-    resume_data = {
-        'skills': resume.skills or [],
-        'experience': resume.experience or [],
-        'education': resume.education or [],
-        'raw_text': resume.raw_text or ''
-    }
-    
-    for job in jobs:
-        # Prepare job data
-        job_data = {
-            'title': job.title,
-            'description': job.description,
-            'requirements': job.requirements,
-            'required_skills': job.required_skills or [],
-            'preferred_skills': job.preferred_skills or [],
-            'keywords': job.keywords or [],
-            'experience_level': job.experience_level
-        }
-        
-        # Calculate match score
-        match_score = job_matcher.calculate_compatibility_score(resume_data, job_data)
-        
-        # Only include jobs above minimum score
-        if match_score.overall_score >= min_score:
-            recommendations.append(ResumeMatch(
-                job_id=job.id,
-                job_title=job.title,
-                company=job.company,
-                overall_score=match_score.overall_score,
-                skill_score=match_score.skill_score,
-                experience_score=match_score.experience_score,
-                education_score=match_score.education_score,
-                keyword_score=match_score.keyword_score,
-                matched_skills=match_score.matched_skills,
-                missing_skills=match_score.missing_skills,
-                strengths=match_score.strengths,
-                weaknesses=match_score.weaknesses,
-                recommendations=match_score.recommendations
-            ))
-    
-    # Sort by overall score and limit results
-    recommendations.sort(key=lambda x: x.overall_score, reverse=True)
-    return recommendations[:limit]
+    for row in rows:
+        match_details = row.match_details or {}
+        recommendations.append(ResumeMatch(
+            job_id=row.job_id,
+            job_title=row.title,
+            company=row.company,
+            overall_score=row.overall_score,
+            skill_score=row.skill_score,
+            experience_score=row.experience_score,
+            education_score=row.education_score,
+            keyword_score=row.keyword_score,
+            matched_skills=match_details.get('matched_skills', []),
+            missing_skills=match_details.get('missing_skills', []),
+            strengths=match_details.get('strengths', []),
+            weaknesses=match_details.get('weaknesses', []),
+            recommendations=match_details.get('recommendations', [])
+        ))
+    
+    return recommendations
 
 
 @router.get("/job/{job_id}/candidates")
-async def get_job_candidates(
+def get_job_candidates(
     job_id: int,
     limit: int = Query(20, ge=1, le=100),
     min_score: float = Query(60.0, ge=0.0, le=100.0),
@@ -221,51 +184,50 @@ async def get_job_candidates(
     """Get ranked candidates for a job (for recruiters)."""
     
     # Check if user can view candidates
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
+    posted_by_id = db.query(Job.posted_by_id).filter(Job.id == job_id).scalar()
+    if posted_by_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
     # Check permissions (job poster or admin)
-    if job.posted_by_id != current_user.id and not current_user.role.value in ['admin', 'faculty']:
+    if posted_by_id != current_user.id and not current_user.role.value in ['admin', 'faculty']:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only view candidates for your own job postings"
         )
     
-    # Get job matches for this job
-    matches = db.query(JobMatch).filter(
+    # Get job matches for this job along with their user and resume in one query,
+    # selecting only the columns the response needs
+    rows = db.query(
+        User.id.label('user_id'),
+        User.full_name.label('user_name'),
+        User.email.label('user_email'),
+        Resume.id.label('resume_id'),
+        JobMatch.overall_score,
+        JobMatch.skill_score,
+        JobMatch.experience_score,
+        JobMatch.education_score,
+        JobMatch.keyword_score,
+        JobMatch.match_details,
+        JobMatch.created_at
+    ).join(
+        User, User.id == JobMatch.user_id
+    ).join(
+        Resume, Resume.id == JobMatch.resume_id
+    ).filter(
         JobMatch.job_id == job_id,
         JobMatch.overall_score >= min_score
     ).order_by(JobMatch.overall_score.desc()).limit(limit).all()
     
-    candidates = []
-    for match in matches:
-        user = db.query(User).filter(User.id == match.user_id).first()
-        resume = db.query(Resume).filter(Resume.id == match.resume_id).first()
-        
-        if user and resume:
-            candidates.append({
-                'user_id': user.id,
-                'user_name': user.full_name,
-                'user_email': user.email,
-                'resume_id': resume.id,
-                'overall_score': match.overall_score,
-                'skill_score': match.skill_score,
-                'experience_score': match.experience_score,
-                'education_score': match.education_score,
-                'keyword_score': match.keyword_score,
-                'match_details': match.match_details,
-                'created_at': match.created_at
-            })
+    candidates = [dict(row._mapping) for row in rows]
     
     return candidates
 
 
 @router.post("/apply/{job_id}")
-async def apply_to_job(
+def apply_to_job(
     job_id: int,
     resume_id: int,
     cover_letter: Optional[str] = None,
@@ -294,12 +256,14 @@ async def apply_to_job(
         )
     
     # Check if already applied
-    existing_application = db.query(Application).filter(
-        Application.job_id == job_id,
-        Application.user_id == current_user.id
-    ).first()
-    
-    if existing_application:
+    already_applied = db.query(
+        db.query(Application.id).filter(
+            Application.job_id == job_id,
+            Application.user_id == current_user.id
+        ).exists()
+    ).scalar()
+    
+    if already_applied:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already applied to this job"
@@ -312,7 +276,16 @@ async def apply_to_job(
         JobMatch.resume_id == resume_id
     ).first()
     
-    compatibility_score = job_match.overall_score if job_match else None
+    if job_match:
+        match_scores = job_match
+        match_details = job_match.match_details
+    elif resume.is_processed == "completed":
+        # Score the application now instead of storing it without a match
+        match_scores = compute_and_store_match(db, current_user.id, resume, job)
+        match_details = build_match_details(match_scores)
+    else:
+        match_scores = None
+        match_details = None
     
     # Create application
     application = Application(
@@ -321,17 +294,95 @@ async def apply_to_job(
         resume_id=resume_id,
         cover_letter=cover_letter,
         status=ApplicationStatus.APPLIED,
-        compatibility_score=compatibility_score,
-        skill_match_score=job_match.skill_score if job_match else None,
-        experience_match_score=job_match.experience_score if job_match else None,
-        keyword_match_score=job_match.keyword_score if job_match else None,
-        matched_skills=job_match.match_details.get('matched_skills') if job_match and job_match.match_details else None,
-        missing_skills=job_match.match_details.get('missing_skills') if job_match and job_match.match_details else None,
-        match_analysis=job_match.match_details if job_match else None
+        compatibility_score=match_scores.overall_score if match_scores else None,
+        skill_match_score=match_scores.skill_score if match_scores else None,
+        experience_match_score=match_scores.experience_score if match_scores else None,
+        keyword_match_score=match_scores.keyword_score if match_scores else None,
+        matched_skills=match_details.get('matched_skills') if match_details else None,
+        missing_skills=match_details.get('missing_skills') if match_details else None,
+        match_analysis=match_details
     )
     
     db.add(application)
     db.commit()
     db.refresh(application)
     
-    return {"message": "Application submitted successfully", "application_id": application.id}
\ No newline at end of file
+    return {"message": "Application submitted successfully", "application_id": application.id}
+
+
+def build_resume_match_data(resume: Resume) -> dict:
+    """Build the resume input expected by the job matcher."""
+    return {
+        # Match results are cached per resume and job version
+        'cache_key': (resume.id, resume.version),
+        'skills': resume.skills or [],
+        'experience': resume.experience or [],
+        'education': resume.education or [],
+        'raw_text': resume.raw_text or ''
+    }
+
+
+def build_job_match_data(job: Job) -> dict:
+    """Build the job input expected by the job matcher."""
+    return {
+        # Normalized job features are cached per posting version
+        'cache_key': (job.id, job.version),
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'required_skills': job.required_skills or [],
+        'preferred_skills': job.preferred_skills or [],
+        'keywords': job.keywords or [],
+        'experience_level': job.experience_level
+    }
+
+
+def build_match_details(match_score: MatchScore) -> dict:
+    """Build the match_details payload stored with a JobMatch."""
+    return {
+        'matched_skills': match_score.matched_skills,
+        'missing_skills': match_score.missing_skills,
+        'strengths': match_score.strengths,
+        'weaknesses': match_score.weaknesses,
+        'recommendations': match_score.recommendations
+    }
+
+
+def compute_and_store_match(db: Session, user_id: int, resume: Resume, job: Job) -> MatchScore:
+    """Score a resume against a job and upsert the JobMatch (not committed)."""
+    match_score = job_matcher.calculate_compatibility_score(
+        build_resume_match_data(resume),
+        build_job_match_data(job)
+    )
+    upsert_job_match(db, job, user_id, resume, match_score)
+    return match_score
+
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+def upsert_job_match(db: Session, job: Job, user_id: int, resume: Resume, match_score: MatchScore):
+    """Insert or update the JobMatch for (job, user_id, resume) in a single statement."""
+    insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+    
+    scores = {
+        'overall_score': match_score.overall_score,
+        'skill_score': match_score.skill_score,
+        'experience_score': match_score.experience_score,
+        'education_score': match_score.education_score,
+        'keyword_score': match_score.keyword_score,
+        'match_details': build_match_details(match_score),
+        'job_version': job.version,
+        'resume_version': resume.version
+    }
+    
+    stmt = insert(JobMatch).values(job_id=job.id, user_id=user_id, resume_id=resume.id, **scores)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['job_id', 'user_id', 'resume_id'],
+        set_={**scores, 'updated_at': func.now()}
+    )
+    db.execute(stmt)
\ No newline at end of file
@@ -1,115 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Header
+from fastapi.responses import FileResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import Session, load_only
 from typing import List, Optional
 import os
 import uuid
+import hashlib
+from bisect import bisect_right
 import json
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.config import settings
 from app.api.routes.auth import get_current_active_user
 from app.models.user import User
 from app.models.resume import Resume
 from app.services.resume_parser import resume_parser
 from app.services.job_matcher import job_matcher
-from app.schemas.resume import ResumeResponse, ResumeAnalysis, ResumeCreate
+from app.schemas.resume import ResumeResponse, ResumeListItem, ResumeAnalysis, ResumeCreate
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+
 
 @router.post("/upload", response_model=ResumeResponse)
-async def upload_resume(
+def upload_resume(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, max_length=64),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Upload and parse a resume file."""
+    """Upload and parse a resume file.
     
-    # Validate file type
-    allowed_extensions = ['.pdf', '.doc', '.docx', '.txt']
-    file_extension = os.path.splitext(file.filename)[1].lower()
+    Clients may send an Idempotency-Key header so that retried uploads
+    return the original resume instead of storing and parsing it again.
+    """
     
-    if file_extension not in allowed_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file_extension} not supported. Allowed types: {allowed_extensions}"
-        )
+    if idempotency_key:
+        existing_resume = get_resume_by_upload_key(db, current_user.id, idempotency_key)
+        if existing_resume:
+            return existing_resume
     
     # Validate file size
-    if file.size > settings.MAX_FILE_SIZE:
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File size too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
         )
     
-    # Create upload directory if it doesn't exist
-    upload_dir = settings.UPLOAD_DIRECTORY
-    os.makedirs(upload_dir, exist_ok=True)
+    # Validate file type
+    dot = file.filename.rfind('.')
+    file_extension = file.filename[dot:].lower() if dot >= 0 else ''
+    
+    if file_extension not in settings.ALLOWED_RESUME_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type {file_extension} not supported. Allowed types: {sorted(settings.ALLOWED_RESUME_EXTENSIONS)}"
+        )
     
-    # Generate unique filename
+    # Generate unique filename (the upload directory is created at startup)
     file_id = str(uuid.uuid4())
-    filename = f"{file_id}_{file.filename}"
-    file_path = os.path.join(upload_dir, filename)
+    file_path = os.path.join(settings.UPLOAD_DIRECTORY, f"{file_id}_{file.filename}")
     
     try:
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        file_size, content_hash = write_upload_to_disk(file, file_path)
         
         # Create database record
         db_resume = Resume(
             user_id=current_user.id,
             filename=file.filename,
             file_path=file_path,
-            file_size=file.size,
+            file_size=file_size,
             file_type=file_extension,
+            content_hash=content_hash,
+            upload_key=idempotency_key,
             is_processed="pending"
         )
         
-        db.add(db_resume)
-        db.commit()
-        db.refresh(db_resume)
-        
-        # Parse resume asynchronously (in real app, this would be a background task)
         try:
-            extracted_info = resume_parser.parse_resume(file_path)
-            
-            # Update resume with parsed data
-            db_resume.raw_text = resume_parser.extract_text_from_file(file_path)
-            db_resume.parsed_data = {
-                "name": extracted_info.name,
-                "email": extracted_info.email,
-                "phone": extracted_info.phone,
-                "address": extracted_info.address
-            }
-            db_resume.skills = extracted_info.skills
-            db_resume.experience = [exp.__dict__ if hasattr(exp, '__dict__') else exp for exp in extracted_info.experience]
-            db_resume.education = [edu.__dict__ if hasattr(edu, '__dict__') else edu for edu in extracted_info.education]
-            db_resume.certifications = extracted_info.certifications
-            db_resume.is_processed = "completed"
-            
-            # Calculate quality score (simplified)
-            quality_score = calculate_resume_quality_score(extracted_info)
-            db_resume.quality_score = quality_score
-            
-            # Generate strengths, weaknesses, and suggestions
-            analysis = analyze_resume_quality(extracted_info, db_resume.raw_text)
-            db_resume.strengths = analysis['strengths']
-            db_resume.weaknesses = analysis['weaknesses']
-            db_resume.suggestions = analysis['suggestions']
-            
-        except Exception as e:
-            db_resume.is_processed = "failed"
-            db_resume.processing_error = str(e)
+            reused_duplicate = save_uploaded_resume(db, db_resume)
+        except IntegrityError:
+            if not idempotency_key:
+                raise
+            # A concurrent retry with the same key stored the resume first
+            db.rollback()
+            os.remove(file_path)
+            return get_resume_by_upload_key(db, current_user.id, idempotency_key)
         
-        db.commit()
-        db.refresh(db_resume)
+        if not reused_duplicate:
+            # Parse resume in the background so the upload returns immediately;
+            # clients poll the resume until is_processed leaves "pending"
+            background_tasks.add_task(process_resume, db_resume.id)
         
         return db_resume
         
+    except HTTPException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
     except Exception as e:
         # Clean up file if database operation fails
         if os.path.exists(file_path):
@@ -120,83 +112,114 @@ async def upload_resume(
         )
 
 
-@router.get("/", response_model=List[ResumeResponse])
-async def get_user_resumes(
+@router.get("/", response_model=List[ResumeListItem])
+def get_user_resumes(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all resumes for the current user."""
-    resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
+    """Get all resumes for the current user (summary fields only)."""
+    resumes = db.query(Resume).options(
+        load_only(
+            Resume.id,
+            Resume.filename,
+            Resume.file_size,
+            Resume.file_type,
+            Resume.quality_score,
+            Resume.is_processed,
+            Resume.created_at
+        )
+    ).filter(Resume.user_id == current_user.id).all()
     return resumes
 
 
 @router.get("/{resume_id}", response_model=ResumeResponse)
-async def get_resume(
+def get_resume(
     resume_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific resume by ID."""
-    resume = db.query(Resume).filter(
-        Resume.id == resume_id,
-        Resume.user_id == current_user.id
-    ).first()
-    
-    if not resume:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Resume not found"
-        )
+    resume = get_user_resume(db, current_user.id, resume_id)
     
     return resume
 
 
-@router.delete("/{resume_id}")
-async def delete_resume(
+@router.get("/{resume_id}/file")
+def download_resume_file(
     resume_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Delete a resume."""
-    resume = db.query(Resume).filter(
-        Resume.id == resume_id,
-        Resume.user_id == current_user.id
-    ).first()
+    """Download the original resume file."""
+    resume = get_user_resume(
+        db,
+        current_user.id,
+        resume_id,
+        options=[load_only(Resume.id, Resume.filename, Resume.file_path)]
+    )
     
-    if not resume:
+    if not resume.file_path or not os.path.isfile(resume.file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Resume not found"
+            detail="Resume file not found"
         )
     
-    # Delete file from filesystem
-    if os.path.exists(resume.file_path):
-        os.remove(resume.file_path)
+    # FileResponse streams from disk (using sendfile where the server supports it)
+    return FileResponse(resume.file_path, filename=resume.filename)
+
+
+@router.delete("/{resume_id}")
+def delete_resume(
+    resume_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a resume."""
+    # Lock the row so concurrent deletes of the same resume are serialized
+    resume = get_user_resume(db, current_user.id, resume_id, for_update=True)
+    file_path = resume.file_path
     
     # Delete from database
     db.delete(resume)
     db.commit()
+    job_matcher.invalidate(resume_id=resume_id)
+    
+    # Delete file from filesystem
+    if file_path:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
     
     return {"message": "Resume deleted successfully"}
 
 
 @router.get("/{resume_id}/analysis", response_model=ResumeAnalysis)
-async def get_resume_analysis(
+def get_resume_analysis(
     resume_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get detailed analysis of a resume."""
-    resume = db.query(Resume).filter(
-        Resume.id == resume_id,
-        Resume.user_id == current_user.id
-    ).first()
-    
-    if not resume:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Resume not found"
-        )
+    resume = get_user_resume(
+        db,
+        current_user.id,
+        resume_id,
+        options=[
+            load_only(
+                Resume.id,
+                Resume.is_processed,
+                Resume.quality_score,
+                Resume.strengths,
+                Resume.weaknesses,
+                Resume.suggestions,
+                Resume.skills,
+                Resume.experience_count,
+                Resume.education_count,
+                Resume.certification_count
+            )
+        ]
+    )
     
     if resume.is_processed != "completed":
         raise HTTPException(
@@ -211,62 +234,206 @@ async def get_resume_analysis(
         weaknesses=resume.weaknesses or [],
         suggestions=resume.suggestions or [],
         skills=resume.skills or [],
-        experience_count=len(resume.experience or []),
-        education_count=len(resume.education or []),
-        certification_count=len(resume.certifications or [])
+        experience_count=resume.experience_count or 0,
+        education_count=resume.education_count or 0,
+        certification_count=resume.certification_count or 0
     )
 
 
-def calculate_resume_quality_score(extracted_info) -> float:
-    """Calculate a quality score for the resume based on completeness and content."""
-    score = 0.0
-    max_score = 100.0
-    
-    # Basic information (20 points)
-    if extracted_info.name:
-        score += 5
-    if extracted_info.email:
-        score += 5
-    if extracted_info.phone:
-        score += 5
-    if extracted_info.address:
-        score += 5
+def write_upload_to_disk(file: UploadFile, file_path: str) -> tuple:
+    """Copy an upload to disk in fixed-size chunks, returning its size and SHA-256 digest."""
+    file_size = 0
+    hasher = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            hasher.update(chunk)
+            # Enforce the size limit on the bytes actually received
+            if file_size > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File size too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
+                )
+            buffer.write(chunk)
+    return file_size, hasher.hexdigest()
+
+
+def get_user_resume(
+    db: Session,
+    user_id: int,
+    resume_id: int,
+    options: Optional[list] = None,
+    for_update: bool = False
+) -> Resume:
+    """Get a resume owned by the user, raising 404 if it doesn't exist."""
+    query = db.query(Resume)
+    if options:
+        query = query.options(*options)
+    query = query.filter(
+        Resume.id == resume_id,
+        Resume.user_id == user_id
+    )
+    if for_update:
+        query = query.with_for_update()
     
-    # Skills (25 points)
-    skill_count = len(extracted_info.skills)
-    if skill_count >= 10:
-        score += 25
-    elif skill_count >= 5:
-        score += 20
-    elif skill_count >= 3:
-        score += 15
-    elif skill_count >= 1:
-        score += 10
+    resume = query.first()
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found"
+        )
+    return resume
+
+
+def get_resume_by_upload_key(db: Session, user_id: int, upload_key: str) -> Optional[Resume]:
+    """Get the resume a user uploaded with the given idempotency key."""
+    return db.query(Resume).filter(
+        Resume.user_id == user_id,
+        Resume.upload_key == upload_key
+    ).first()
+
+
+def process_resume(resume_id: int):
+    """Parse a stored resume file and save the results (runs as a background task)."""
+    db = SessionLocal()
+    try:
+        db_resume = db.get(Resume, resume_id)
+        if not db_resume:
+            return
+        
+        try:
+            parsed_result = resume_parser.parse_resume(db_resume.file_path)
+            extracted_info = parsed_result['extracted_info']
+            
+            # Update resume with parsed data
+            db_resume.raw_text = parsed_result['raw_text']
+            db_resume.parsed_data = {
+                "name": extracted_info.name,
+                "email": extracted_info.email,
+                "phone": extracted_info.phone,
+                "address": extracted_info.address
+            }
+            db_resume.skills = extracted_info.skills
+            # The parser already returns experience and education entries as dicts
+            db_resume.experience = extracted_info.experience
+            db_resume.education = extracted_info.education
+            db_resume.certifications = extracted_info.certifications
+            db_resume.experience_count = len(extracted_info.experience)
+            db_resume.education_count = len(extracted_info.education)
+            db_resume.certification_count = len(extracted_info.certifications)
+            db_resume.is_processed = "completed"
+            
+            # Calculate quality score (simplified)
+            quality_score = calculate_resume_quality_score(extracted_info)
+            db_resume.quality_score = quality_score
+            
+            # Generate strengths, weaknesses, and suggestions
+            analysis = analyze_resume_quality(extracted_info, db_resume.raw_text)
+            db_resume.strengths = analysis['strengths']
+            db_resume.weaknesses = analysis['weaknesses']
+            db_resume.suggestions = analysis['suggestions']
+            
+        except Exception as e:
+            db_resume.is_processed = "failed"
+            db_resume.processing_error = str(e)
+        
+        db_resume.version = Resume.version + 1
+        try:
+            db.commit()
+        except StaleDataError:
+            # The resume was deleted while it was being parsed
+            db.rollback()
+    finally:
+        db.close()
+
+
+def save_uploaded_resume(db: Session, db_resume: Resume) -> bool:
+    """Add and commit an uploaded resume, reusing the results of the same user's identical parsed file.
     
-    # Experience (30 points)
-    exp_count = len(extracted_info.experience)
-    if exp_count >= 3:
-        score += 30
-    elif exp_count >= 2:
-        score += 25
-    elif exp_count >= 1:
-        score += 20
+    Returns True when an earlier parse was reused, so no parsing is needed.
+    Identical files from other users are not copied; their parse is still
+    reused through the resume parser's content-keyed cache.
+    """
+    parsed_duplicate = db.query(Resume).filter(
+        Resume.user_id == db_resume.user_id,
+        Resume.content_hash == db_resume.content_hash,
+        Resume.is_processed == "completed"
+    ).first()
+    if parsed_duplicate:
+        copy_parsed_resume(parsed_duplicate, db_resume)
     
-    # Education (15 points)
-    edu_count = len(extracted_info.education)
-    if edu_count >= 2:
-        score += 15
-    elif edu_count >= 1:
-        score += 12
+    db.add(db_resume)
+    db.commit()
+    db.refresh(db_resume)
+    return parsed_duplicate is not None
+
+
+def copy_parsed_resume(source: Resume, target: Resume):
+    """Copy parse and analysis results from one resume to another."""
+    for field in (
+        'raw_text', 'parsed_data', 'skills', 'experience', 'education', 'certifications',
+        'experience_count', 'education_count', 'certification_count',
+        'quality_score', 'strengths', 'weaknesses', 'suggestions'
+    ):
+        setattr(target, field, getattr(source, field))
+    target.is_processed = "completed"
+
+
+# Quality tiers per resume section, ordered by minimum item count:
+# (minimum count, points, strength, weakness, suggestion)
+SKILL_TIERS = (
+    (0, 0, None, "Limited skills information", "Add more relevant technical and soft skills"),
+    (1, 10, None, "Limited skills information", "Add more relevant technical and soft skills"),
+    (3, 15, None, "Limited skills information", "Add more relevant technical and soft skills"),
+    (5, 20, "Good variety of skills listed", None, None),
+    (10, 25, "Comprehensive skills section", None, None),
+)
+EXPERIENCE_TIERS = (
+    (0, 0, None, "Limited work experience information", "Include internships, projects, or volunteer work"),
+    (1, 20, "Relevant work experience included", None, None),
+    (2, 25, "Relevant work experience included", None, None),
+    (3, 30, "Extensive work experience", None, None),
+)
+EDUCATION_TIERS = (
+    (0, 0, None, "Missing education information", "Include your educational qualifications"),
+    (1, 12, "Educational background provided", None, None),
+    (2, 15, "Educational background provided", None, None),
+)
+CERTIFICATION_TIERS = (
+    (0, 0, None, None, "Consider adding relevant certifications or training"),
+    (1, 5, "Professional certifications included", None, None),
+    (3, 10, "Multiple professional certifications", None, None),
+)
+QUALITY_SECTIONS = (
+    ('skills', SKILL_TIERS),
+    ('experience', EXPERIENCE_TIERS),
+    ('education', EDUCATION_TIERS),
+    ('certifications', CERTIFICATION_TIERS),
+)
+QUALITY_THRESHOLDS = {section: [tier[0] for tier in tiers] for section, tiers in QUALITY_SECTIONS}
+
+
+def get_quality_tiers(extracted_info) -> list:
+    """Look up the quality tier of each resume section by its item count."""
+    return [
+        tiers[bisect_right(QUALITY_THRESHOLDS[section], len(getattr(extracted_info, section))) - 1]
+        for section, tiers in QUALITY_SECTIONS
+    ]
+
+
+def calculate_resume_quality_score(extracted_info) -> float:
+    """Calculate a quality score for the resume based on completeness and content."""
+    # Basic information (5 points each)
+    score = 5.0 * sum(
+        1 for value in (
+            extracted_info.name, extracted_info.email, extracted_info.phone, extracted_info.address
+        ) if value
+    )
     
-    # Certifications (10 points)
-    cert_count = len(extracted_info.certifications)
-    if cert_count >= 3:
-        score += 10
-    elif cert_count >= 1:
-        score += 5
+    # Skills, experience, education and certifications
+    score += sum(tier[1] for tier in get_quality_tiers(extracted_info))
     
-    return min(score, max_score)
+    return min(score, 100.0)
 
 
 def analyze_resume_quality(extracted_info, raw_text: str) -> dict:
@@ -282,42 +449,14 @@ def analyze_resume_quality(extracted_info, raw_text: str) -> dict:
         weaknesses.append("Missing essential contact information")
         suggestions.append("Ensure your resume includes name, email, and phone number")
     
-    # Analyze skills
-    skill_count = len(extracted_info.skills)
-    if skill_count >= 10:
-        strengths.append("Comprehensive skills section")
-    elif skill_count >= 5:
-        strengths.append("Good variety of skills listed")
-    else:
-        weaknesses.append("Limited skills information")
-        suggestions.append("Add more relevant technical and soft skills")
-    
-    # Analyze experience
-    exp_count = len(extracted_info.experience)
-    if exp_count >= 3:
-        strengths.append("Extensive work experience")
-    elif exp_count >= 1:
-        strengths.append("Relevant work experience included")
-    else:
-        weaknesses.append("Limited work experience information")
-        suggestions.append("Include internships, projects, or volunteer work")
-    
-    # Analyze education
-    edu_count = len(extracted_info.education)
-    if edu_count >= 1:
-        strengths.append("Educational background provided")
-    else:
-        weaknesses.append("Missing education information")
-        suggestions.append("Include your educational qualifications")
-    
-    # Analyze certifications
-    cert_count = len(extracted_info.certifications)
-    if cert_count >= 3:
-        strengths.append("Multiple professional certifications")
-    elif cert_count >= 1:
-        strengths.append("Professional certifications included")
-    else:
-        suggestions.append("Consider adding relevant certifications or training")
+    # Analyze skills, experience, education and certifications
+    for _, _, strength, weakness, suggestion in get_quality_tiers(extracted_info):
+        if strength:
+            strengths.append(strength)
+        if weakness:
+            weaknesses.append(weakness)
+        if suggestion:
+            suggestions.append(suggestion)
     
     # Text analysis
     word_count = len(raw_text.split())
@@ -10,7 +10,7 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(
+def get_current_user_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current user's profile."""
@@ -18,7 +18,7 @@ async def get_current_user_profile(
 
 
 @router.put("/me", response_model=UserResponse)
-async def update_current_user_profile(
+def update_current_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -37,7 +37,7 @@ async def update_current_user_profile(
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_all_users(
+def get_all_users(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -53,7 +53,7 @@ async def get_all_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user_by_id(
+def get_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
         os.getenv("DATABASE_URL") or 
         "sqlite:///./ats.db"
     )
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 10  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
@@ -30,9 +34,11 @@ class Settings(BaseSettings):
     # File Storage
     UPLOAD_DIRECTORY: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    ALLOWED_RESUME_EXTENSIONS: List[str] = [".pdf", ".doc", ".docx", ".txt"]
     
     # NLP
     SPACY_MODEL: str = "en_core_web_sm"
+    SPACY_MODEL_DIR: str = ""  # Optional persistent directory for a saved copy of the model
     
     class Config:
         env_file = ".env"
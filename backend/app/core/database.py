@@ -1,10 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from app.core.config import settings
 import logging
 import os
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +28,42 @@ else:
     database_url = settings.DATABASE_URL
     logger.info(f"Using database from settings: {database_url.split('@')[0]}@***" if '@' in database_url else database_url)
 
+
+def json_serializer(value) -> str:
+    """Serialize JSON column values with orjson."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
 # Create database engine
-engine = create_engine(database_url)
+if database_url.startswith("sqlite"):
+    # Sessions are used from FastAPI's threadpool and background tasks
+    engine = create_engine(
+        database_url,
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    # Size the pool for concurrent workers and drop stale connections before use
+    engine = create_engine(
+        database_url,
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": 5} if database_url.startswith("postgres") else {}
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
+# JSON column type, stored as binary JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 async def init_db():
     """Initialize database tables."""
@@ -45,6 +77,102 @@ async def init_db():
     
     # Create tables
     Base.metadata.create_all(bind=engine)
+    
+    # Bring tables created by an older release up to date
+    with engine.begin() as connection:
+        migrate_db(connection)
+
+
+def migrate_db(connection):
+    """Add columns and indexes that existing tables are missing.
+    
+    create_all only creates missing tables and never alters existing ones,
+    so columns and indexes added to a model since its table was created are
+    applied here, and json columns are converted to jsonb on PostgreSQL.
+    Every step is skipped once applied.
+    """
+    from app.models.resume import SKILLS_INDEX_DDL
+    
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    added_columns = set()
+    
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                logger.info(f"Adding column {table.name}.{column.name}")
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {CreateColumn(column).compile(dialect=connection.dialect)}"
+                )
+                added_columns.add(f"{table.name}.{column.name}")
+            elif (
+                isinstance(column.type.dialect_impl(connection.dialect), JSONB)
+                and not isinstance(existing_columns[column.name], JSONB)
+            ):
+                # Tables created before JSON columns were stored as JSONB
+                logger.info(f"Converting column {table.name}.{column.name} to jsonb")
+                column_name = preparer.quote(column.name)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ALTER COLUMN {column_name} TYPE jsonb USING {column_name}::jsonb"
+                )
+    
+    # Resumes parsed before the entry counts existed only have the JSON arrays
+    if added_columns & {"resumes.experience_count", "resumes.education_count", "resumes.certification_count"}:
+        backfill_resume_counts(connection)
+    
+    # Job match upserts rely on ON CONFLICT over this unique key
+    job_match_keys = [constraint['name'] for constraint in inspector.get_unique_constraints("job_matches")]
+    job_match_keys += [index['name'] for index in inspector.get_indexes("job_matches") if index['unique']]
+    if "uq_job_matches_job_user_resume" not in job_match_keys:
+        add_job_match_unique_key(connection)
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    
+    # Indexes created by after_create DDL, which only runs for new tables
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(SKILLS_INDEX_DDL)
+
+
+# Length of a JSON array column, 0 for null or non-array values. The column is
+# cast on PostgreSQL since tables created before JSONB store plain json.
+JSON_ARRAY_LENGTH = {
+    'postgresql': "CASE WHEN jsonb_typeof({0}::jsonb) = 'array' THEN jsonb_array_length({0}::jsonb) ELSE 0 END",
+    'sqlite': "coalesce(json_array_length({0}), 0)"
+}
+
+
+def add_job_match_unique_key(connection):
+    """Add the (job_id, user_id, resume_id) unique key to job_matches.
+    
+    Older releases checked for an existing match before inserting, which
+    could race and store duplicates; all but the newest row of each are
+    deleted first so the index can be created.
+    """
+    logger.info("Adding unique key uq_job_matches_job_user_resume")
+    connection.exec_driver_sql(
+        "DELETE FROM job_matches WHERE id NOT IN "
+        "(SELECT max(id) FROM job_matches GROUP BY job_id, user_id, resume_id)"
+    )
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX uq_job_matches_job_user_resume ON job_matches (job_id, user_id, resume_id)"
+    )
+
+
+def backfill_resume_counts(connection):
+    """Fill in the entry counts of parsed resumes from their JSON arrays."""
+    array_length = JSON_ARRAY_LENGTH[connection.dialect.name]
+    connection.exec_driver_sql(
+        "UPDATE resumes SET "
+        f"experience_count = {array_length.format('experience')}, "
+        f"education_count = {array_length.format('education')}, "
+        f"certification_count = {array_length.format('certifications')} "
+        "WHERE is_processed = 'completed' AND experience_count IS NULL"
+    )
 
 
 def get_db():
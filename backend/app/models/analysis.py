@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from app.core.database import Base, JSONType
 
 
 class Analysis(Base):
@@ -18,13 +18,13 @@ class Analysis(Base):
     
     # Analysis results
     ats_score = Column(Float, nullable=False)
-    missing_keywords = Column(JSON, nullable=False, default=list)
-    strong_keywords = Column(JSON, nullable=False, default=list)
-    suggestions = Column(JSON, nullable=False, default=list)
+    missing_keywords = Column(JSONType, nullable=False, default=list)
+    strong_keywords = Column(JSONType, nullable=False, default=list)
+    suggestions = Column(JSONType, nullable=False, default=list)
     
     # Additional analysis data
     resume_text = Column(Text, nullable=True)
-    analysis_details = Column(JSON, nullable=True)
+    analysis_details = Column(JSONType, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -32,4 +32,9 @@ class Analysis(Base):
     
     # Relationships
     user = relationship("User", back_populates="analyses")
-    resume = relationship("Resume", back_populates="analyses")
\ No newline at end of file
+    resume = relationship("Resume", back_populates="analyses")
+    
+    __table_args__ = (
+        # Per-user history listing, newest first
+        Index("ix_analyses_user_id_created_at", user_id, created_at.desc()),
+    )
\ No newline at end of file
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONType
 import enum
 
 
@@ -39,9 +39,9 @@ class Application(Base):
     keyword_match_score = Column(Float, nullable=True)
     
     # Detailed analysis
-    matched_skills = Column(JSON, nullable=True)
-    missing_skills = Column(JSON, nullable=True)
-    match_analysis = Column(JSON, nullable=True)
+    matched_skills = Column(JSONType, nullable=True)
+    missing_skills = Column(JSONType, nullable=True)
+    match_analysis = Column(JSONType, nullable=True)
     
     # Recruiter feedback
     recruiter_notes = Column(Text, nullable=True)
@@ -50,6 +50,11 @@ class Application(Base):
     # Timestamps
     applied_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Already-applied check per user and job
+        Index("ix_applications_user_id_job_id", user_id, job_id),
+    )
 
 
 class JobMatch(Base):
@@ -73,8 +78,20 @@ class JobMatch(Base):
     keyword_score = Column(Float, nullable=False)
     
     # Match details
-    match_details = Column(JSON, nullable=True)
+    match_details = Column(JSONType, nullable=True)
+    
+    # Job and resume versions the scores were computed from
+    job_version = Column(Integer, nullable=True)
+    resume_version = Column(Integer, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("job_id", "user_id", "resume_id", name="uq_job_matches_job_user_resume"),
+        # Ranked candidate listing per job
+        Index("ix_job_matches_job_id_overall_score", job_id, overall_score.desc()),
+        # Stored matches for a user's resume (recommendations)
+        Index("ix_job_matches_user_id_resume_id", user_id, resume_id),
+    )
\ No newline at end of file
@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONType
+
+# Document used for full-text job search on PostgreSQL. The GIN expression index
+# below and the search filter in get_jobs must use the exact same expression.
+JOB_SEARCH_DOCUMENT = "coalesce(title, '') || ' ' || coalesce(company, '') || ' ' || coalesce(description, '')"
 
 
 class Job(Base):
@@ -19,12 +23,12 @@ class Job(Base):
     salary_max = Column(Integer, nullable=True)
     
     # Skills and keywords (stored as JSON)
-    required_skills = Column(JSON, nullable=True)
-    preferred_skills = Column(JSON, nullable=True)
-    keywords = Column(JSON, nullable=True)
+    required_skills = Column(JSONType, nullable=True)
+    preferred_skills = Column(JSONType, nullable=True)
+    keywords = Column(JSONType, nullable=True)
     
     # Job status
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
     application_deadline = Column(DateTime(timezone=True), nullable=True)
     
     # Posted by
@@ -33,4 +37,18 @@ class Job(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Incremented in SQL by every update, so stored matches can tell they are
+    # stale; concurrent writers each bump it rather than conflicting
+    version = Column(Integer, nullable=False, server_default="1")
+
+
+event.listen(
+    Job.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_search ON jobs "
+        f"USING gin (to_tsvector('english', {JOB_SEARCH_DOCUMENT}))"
+    ).execute_if(dialect="postgresql")
+)
\ No newline at end of file
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, JSONType
 
 
 class Resume(Base):
@@ -16,22 +16,29 @@ class Resume(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_type = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the file contents
+    upload_key = Column(String(64), nullable=True)  # Client-supplied Idempotency-Key
     
     # Parsed content
     raw_text = Column(Text, nullable=True)
-    parsed_data = Column(JSON, nullable=True)  # Structured parsed data
+    parsed_data = Column(JSONType, nullable=True)  # Structured parsed data
     
     # Extracted information
-    skills = Column(JSON, nullable=True)
-    experience = Column(JSON, nullable=True)
-    education = Column(JSON, nullable=True)
-    certifications = Column(JSON, nullable=True)
+    skills = Column(JSONType, nullable=True)
+    experience = Column(JSONType, nullable=True)
+    education = Column(JSONType, nullable=True)
+    certifications = Column(JSONType, nullable=True)
+    
+    # Entry counts, maintained on write so reads don't load the JSON arrays
+    experience_count = Column(Integer, nullable=True)
+    education_count = Column(Integer, nullable=True)
+    certification_count = Column(Integer, nullable=True)
     
     # Analysis results
     quality_score = Column(Float, nullable=True)
-    strengths = Column(JSON, nullable=True)
-    weaknesses = Column(JSON, nullable=True)
-    suggestions = Column(JSON, nullable=True)
+    strengths = Column(JSONType, nullable=True)
+    weaknesses = Column(JSONType, nullable=True)
+    suggestions = Column(JSONType, nullable=True)
     
     # Processing status
     is_processed = Column(String, default="pending")  # pending, processing, completed, failed
@@ -41,5 +48,27 @@ class Resume(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Incremented in SQL by every update, so stored matches can tell they are
+    # stale; concurrent writers each bump it rather than conflicting
+    version = Column(Integer, nullable=False, server_default="1")
+    
     # Relationships
-    analyses = relationship("Analysis", back_populates="resume")
\ No newline at end of file
+    analyses = relationship("Analysis", back_populates="resume")
+    
+    __table_args__ = (
+        # Per-user listing and owner-scoped lookups by id
+        Index("ix_resumes_user_id_id", user_id, id),
+        # One resume per client idempotency key
+        Index("ix_resumes_user_id_upload_key", user_id, upload_key, unique=True),
+    )
+
+
+# GIN index for skill containment queries (skills @> '["Python"]') on PostgreSQL.
+# It needs skills stored as jsonb; migrate_db creates it on existing tables.
+SKILLS_INDEX_DDL = "CREATE INDEX IF NOT EXISTS ix_resumes_skills ON resumes USING gin (skills)"
+
+event.listen(
+    Resume.__table__,
+    "after_create",
+    DDL(SKILLS_INDEX_DDL).execute_if(dialect="postgresql")
+)
\ No newline at end of file
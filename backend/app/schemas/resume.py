@@ -36,6 +36,16 @@ class ResumeResponse(ResumeBase):
         from_attributes = True
 
 
+class ResumeListItem(ResumeBase):
+    id: int
+    quality_score: Optional[float] = None
+    is_processed: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class ResumeAnalysis(BaseModel):
     resume_id: int
     quality_score: Optional[float]
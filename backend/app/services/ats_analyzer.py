@@ -1,14 +1,22 @@
 import re
 import string
-from typing import List, Tuple, Dict, Set
+import copy
+import hashlib
+from typing import List, Tuple, Dict, Set, Optional
 from collections import Counter, defaultdict
 import math
+from operator import attrgetter
 from dataclasses import dataclass
 
+from app.core.cache import LRUCache
+
 
 @dataclass
 class KeywordMatch:
     """Represents a matched keyword with context and importance"""
+    __slots__ = ('keyword', 'frequency_resume', 'frequency_job', 'importance_score',
+                 'context_matches', 'category')
+    
     keyword: str
     frequency_resume: int
     frequency_job: int
@@ -20,6 +28,9 @@ class KeywordMatch:
 @dataclass
 class WeaknessAnalysis:
     """Detailed analysis of resume weaknesses"""
+    __slots__ = ('missing_hard_skills', 'missing_soft_skills', 'weak_experience_areas',
+                 'missing_education_keywords', 'formatting_issues', 'quantification_gaps')
+    
     missing_hard_skills: List[str]
     missing_soft_skills: List[str]
     weak_experience_areas: List[str]
@@ -31,6 +42,9 @@ class WeaknessAnalysis:
 @dataclass
 class StrengthAnalysis:
     """Detailed analysis of resume strengths"""
+    __slots__ = ('strong_technical_skills', 'strong_experience_matches', 'education_advantages',
+                 'quantified_achievements', 'keyword_density_score')
+    
     strong_technical_skills: List[KeywordMatch]
     strong_experience_matches: List[KeywordMatch]
     education_advantages: List[str]
@@ -46,7 +60,7 @@ class ATSAnalyzer:
     
     def __init__(self):
         # Enhanced stop words for better filtering
-        self.stop_words = {
+        self.stop_words = frozenset({
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
             'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
@@ -56,123 +70,336 @@ class ATSAnalyzer:
             'just', 'so', 'than', 'too', 'any', 'some', 'no', 'not', 'only', 'own',
             'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should',
             'now', 'use', 'work', 'experience', 'years', 'year', 'skills', 'skill'
-        }
+        })
         
         # Advanced skill categorization with importance weights
         self.skill_categories = {
             'critical_technical': {
                 'weight': 1.0,
-                'keywords': [
+                'keywords': (
                     'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js',
                     'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'tensorflow', 'pytorch',
                     'machine learning', 'deep learning', 'artificial intelligence', 'data science',
                     'sql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'kafka',
                     'microservices', 'rest api', 'graphql', 'ci/cd', 'devops', 'agile',
                     'scrum', 'git', 'github', 'gitlab', 'jenkins', 'terraform', 'ansible'
-                ]
+                )
             },
             'important_technical': {
                 'weight': 0.8,
-                'keywords': [
+                'keywords': (
                     'html', 'css', 'bootstrap', 'sass', 'typescript', 'php', 'ruby',
                     'c++', 'c#', 'go', 'rust', 'swift', 'kotlin', 'scala', 'r',
                     'mysql', 'oracle', 'cassandra', 'dynamodb', 'firebase', 'supabase',
                     'express', 'django', 'flask', 'spring', 'laravel', 'rails',
                     'webpack', 'babel', 'nginx', 'apache', 'linux', 'unix', 'windows'
-                ]
+                )
             },
             'frameworks_libraries': {
                 'weight': 0.7,
-                'keywords': [
+                'keywords': (
                     'pandas', 'numpy', 'matplotlib', 'seaborn', 'scikit-learn',
                     'fastapi', 'nextjs', 'nuxt', 'svelte', 'ember', 'backbone',
                     'jquery', 'lodash', 'moment', 'axios', 'fetch', 'websocket',
                     'redux', 'vuex', 'mobx', 'rxjs', 'jest', 'mocha', 'cypress'
-                ]
+                )
             },
             'methodologies': {
                 'weight': 0.6,
-                'keywords': [
+                'keywords': (
                     'agile', 'scrum', 'kanban', 'waterfall', 'lean', 'six sigma',
                     'tdd', 'bdd', 'pair programming', 'code review', 'continuous integration',
                     'continuous deployment', 'test automation', 'unit testing',
                     'integration testing', 'performance testing', 'security testing'
-                ]
+                )
             },
             'soft_skills': {
                 'weight': 0.5,
-                'keywords': [
+                'keywords': (
                     'leadership', 'communication', 'teamwork', 'problem solving',
                     'critical thinking', 'analytical', 'creative', 'innovative',
                     'project management', 'time management', 'organization',
                     'attention to detail', 'multitasking', 'adaptable', 'flexible',
                     'collaborative', 'mentoring', 'coaching', 'presentation skills'
-                ]
+                )
             },
             'certifications': {
                 'weight': 0.9,
-                'keywords': [
+                'keywords': (
                     'aws certified', 'azure certified', 'google cloud certified',
                     'pmp', 'cissp', 'ceh', 'cisa', 'cism', 'comptia', 'cisco',
                     'microsoft certified', 'oracle certified', 'scrum master',
                     'product owner', 'safe', 'itil', 'cobit', 'prince2'
-                ]
+                )
             }
         }
         
+        # Single-word skills are looked up in the token set rather than
+        # searched for as substrings, so 'r' or 'go' only match whole words
+        self._single_word_skills = frozenset(
+            keyword
+            for skill_data in self.skill_categories.values()
+            for keyword in skill_data['keywords']
+            if ' ' not in keyword and '/' not in keyword
+        )
+        
+        # Per category: its single-word skills as a set, so they can be matched
+        # against the tokens in one intersection, and its phrases for substring checks
+        self._category_lookups = tuple(
+            (
+                category,
+                skill_data['keywords'],
+                frozenset(k for k in skill_data['keywords'] if k in self._single_word_skills),
+                tuple(k for k in skill_data['keywords'] if k not in self._single_word_skills)
+            )
+            for category, skill_data in self.skill_categories.items()
+        )
+        
+        # Category weights and boosted keywords, flattened for importance lookups
+        self._category_weights = {
+            category: skill_data['weight'] for category, skill_data in self.skill_categories.items()
+        }
+        self._boosted_keywords = frozenset(
+            ['python', 'java', 'javascript', 'react', 'aws', 'docker', 'kubernetes']
+        )
+        
         # Industry-specific keyword patterns
         self.industry_patterns = {
-            'software': ['development', 'programming', 'coding', 'software', 'application'],
-            'data': ['data', 'analytics', 'analysis', 'statistics', 'machine learning'],
-            'cloud': ['cloud', 'aws', 'azure', 'gcp', 'serverless', 'containerization'],
-            'security': ['security', 'cybersecurity', 'encryption', 'authentication'],
-            'mobile': ['mobile', 'ios', 'android', 'app development', 'react native'],
-            'web': ['web', 'frontend', 'backend', 'fullstack', 'responsive'],
-            'devops': ['devops', 'ci/cd', 'deployment', 'infrastructure', 'monitoring']
+            'software': ('development', 'programming', 'coding', 'software', 'application'),
+            'data': ('data', 'analytics', 'analysis', 'statistics', 'machine learning'),
+            'cloud': ('cloud', 'aws', 'azure', 'gcp', 'serverless', 'containerization'),
+            'security': ('security', 'cybersecurity', 'encryption', 'authentication'),
+            'mobile': ('mobile', 'ios', 'android', 'app development', 'react native'),
+            'web': ('web', 'frontend', 'backend', 'fullstack', 'responsive'),
+            'devops': ('devops', 'ci/cd', 'deployment', 'infrastructure', 'monitoring')
         }
         
         # Experience level indicators
         self.experience_indicators = {
-            'senior': ['senior', 'lead', 'principal', 'architect', 'manager', 'director'],
-            'mid': ['mid-level', 'intermediate', '3-5 years', '4-6 years', '5-7 years'],
-            'junior': ['junior', 'entry', 'associate', 'graduate', '0-2 years', '1-3 years']
+            'senior': ('senior', 'lead', 'principal', 'architect', 'manager', 'director'),
+            'mid': ('mid-level', 'intermediate', '3-5 years', '4-6 years', '5-7 years'),
+            'junior': ('junior', 'entry', 'associate', 'graduate', '0-2 years', '1-3 years')
         }
         
+        # Multi-word technical terms, matched as literal phrases
+        self.multiword_technical_terms = (
+            # Programming and Development
+            'machine learning', 'deep learning', 'artificial intelligence',
+            'data science', 'data analysis', 'data engineering',
+            'web development', 'mobile development', 'software engineering',
+            'full stack', 'front end', 'back end', 'frontend', 'backend',
+            'cloud computing', 'cloud architecture', 'microservices',
+            
+            # Methodologies
+            'agile development', 'scrum master', 'product owner',
+            'test driven development', 'behavior driven development',
+            'continuous integration', 'continuous deployment', 'devops',
+            
+            # Technologies
+            'version control', 'source control', 'code review',
+            'api development', 'rest api', 'graphql api',
+            'database design', 'system architecture', 'network security',
+            
+            # Soft Skills
+            'project management', 'team leadership', 'cross functional',
+            'problem solving', 'critical thinking', 'analytical skills',
+            'communication skills', 'presentation skills',
+            
+            # Industry Terms
+            'business intelligence', 'digital transformation',
+            'user experience', 'user interface', 'customer experience',
+            'product development', 'software architecture'
+        )
+        
         # Action verbs that show impact
-        self.impact_verbs = [
+        self.impact_verbs = frozenset([
             'achieved', 'improved', 'increased', 'decreased', 'reduced', 'optimized',
             'implemented', 'developed', 'created', 'designed', 'built', 'launched',
             'delivered', 'managed', 'led', 'coordinated', 'streamlined', 'automated',
             'enhanced', 'upgraded', 'modernized', 'scaled', 'migrated', 'integrated'
+        ])
+        
+        # Phrases that signal passive, low-impact bullet points
+        self.weak_verbs = ('responsible for', 'worked on', 'helped with', 'involved in')
+        
+        # Terms compared between resume and job for advantages and gaps
+        self.education_terms = (
+            'bachelor', 'master', 'phd', 'mba', 'degree', 'university',
+            'college', 'certification', 'certified', 'diploma'
+        )
+        self.education_requirements = ('bachelor', 'master', 'phd', 'mba', 'degree')
+        self.experience_types = ('management', 'leadership', 'senior', 'architect', 'principal')
+        
+        # Every literal the gap and advantage checks look up in a job description;
+        # each job is scanned for them once and the hits are cached with the job
+        self._job_scan_terms = frozenset(
+            self.education_terms + self.experience_types
+            + self.skill_categories['soft_skills']['keywords']
+        )
+        
+        # Regexes are compiled once and reused on every analysis
+        self._normalization_re, self._normalization_replacements = self._compile_normalization_pattern()
+        self._special_chars_re = re.compile(r'[^\w\s\-\./]')
+        self._quantified_patterns = self._compile_quantified_patterns()
+        self._achievement_patterns = self._compile_achievement_patterns()
+        self._unquantified_patterns = self._compile_unquantified_patterns()
+        self._years_re = re.compile(r'(\d+)\+?\s*years?')
+        self._email_re = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        self._phone_re = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+        
+        # LRU cache of analysis results keyed by (resume, job) digests
+        self._cache = LRUCache(256)
+        
+        # The same job description is usually analyzed against many resumes,
+        # so its cleaned text, keywords, industry and level are cached too
+        self._job_cache = LRUCache(512)
+    
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        """Short digest of a text, used as a cache key"""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _compile_normalization_pattern(self) -> Tuple[re.Pattern, List[str]]:
+        """Compile a single regex that normalizes common technology spellings."""
+        # Each pattern follows a word boundary
+        normalizations = [
+            (r'n\.?js\b', 'nodejs'),
+            (r'c\+\+\b', 'cpp'),
+            (r'c#\b', 'csharp'),
+            (r'\.net\b', 'dotnet'),
+            (r'ai/ml\b', 'artificial intelligence machine learning'),
+            (r'ml/ai\b', 'machine learning artificial intelligence'),
+            (r'ui/ux\b', 'user interface user experience'),
+            (r'ci/cd\b', 'continuous integration continuous deployment')
+        ]
+        # One group per pattern so the match can be mapped to its replacement;
+        # the lookahead on the possible first characters skips most positions
+        alternation = '|'.join(f'({pattern})' for pattern, _ in normalizations)
+        pattern = re.compile(rf'\b(?=[acmnu.])(?:{alternation})')
+        return pattern, [replacement for _, replacement in normalizations]
+    
+    def _compile_quantified_patterns(self) -> List[Tuple[Optional[str], re.Pattern]]:
+        """Compile regex patterns for quantified metrics with the literal each one requires."""
+        # Metrics that start with a number never match at the same position,
+        # so they share one scan behind a digit lookahead
+        numeric_patterns = [
+            r'\d+%\s*(?:improvement|increase|decrease|reduction|growth)',
+            r'\d+(?:,\d+)*\s*(?:users|customers|clients|projects|applications)',
+            r'\d+(?:\.\d+)?x\s*(?:faster|improvement|increase)',
+            r'\d+\s*(?:years?|months?)\s*(?:experience|exp)'
+        ]
+        # Phrases that can overlap one another keep their own scan. The greedy
+        # '.*' phrases backtrack over the rest of the line for every verb they
+        # find, so they only run when the '%' they end with is present
+        quantified_patterns = [
+            (None, rf'(?=\d)(?:{"|".join(numeric_patterns)})'),
+            ('$', r'\$\d+(?:,\d+)*(?:k|m|million|billion)?'),
+            ('%', r'reduced.*by\s*\d+%'),
+            ('%', r'increased.*by\s*\d+%'),
+            ('%', r'improved.*by\s*\d+%'),
+            (None, r'managed\s*\d+\s*(?:people|team|members)'),
+            (None, r'led\s*\d+\s*(?:people|team|members)')
+        ]
+        
+        return [(required, re.compile(pattern, re.IGNORECASE)) for required, pattern in quantified_patterns]
+    
+    def _compile_achievement_patterns(self) -> List[re.Pattern]:
+        """Compile regex patterns for quantified achievements."""
+        # Achievements that start with a number, and those that start with a
+        # verb or noun, cannot match at the same position or inside one
+        # another, so each group shares one scan behind a lookahead
+        numeric_patterns = [
+            r'\d+%\s*(?:improvement|increase|decrease|reduction|growth|faster|better)',
+            r'\d+(?:,\d+)*\s*(?:users|customers|clients|projects|applications|systems)',
+            r'\d+(?:\.\d+)?x\s*(?:improvement|increase|faster|more)',
+            r'\d+\s*(?:award|certification|patent)'
+        ]
+        phrase_patterns = [
+            r'saved\s*\$?\d+(?:,\d+)*',
+            r'generated\s*\$?\d+(?:,\d+)*',
+            r'managed\s*\$?\d+(?:,\d+)*\s*budget',
+            r'team\s*of\s*\d+',
+            r'ranked\s*#?\d+'
+        ]
+        # Dollar amounts also occur inside 'saved $...' style phrases, so they
+        # keep their own scan to be found there too
+        patterns = [
+            rf'(?=\d)(?:{"|".join(numeric_patterns)})',
+            r'\$\d+(?:,\d+)*(?:k|m|million|billion)?',
+            rf'(?=[sgmtr])(?:{"|".join(phrase_patterns)})'
+        ]
+        
+        return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    
+    def _compile_unquantified_patterns(self) -> List[Tuple[str, re.Pattern]]:
+        """Compile regex patterns for statements that could be quantified."""
+        unquantified_patterns = [
+            r'improved\s+(?!\d+%|by\s*\d+)',
+            r'increased\s+(?!\d+%|by\s*\d+)',
+            r'reduced\s+(?!\d+%|by\s*\d+)',
+            r'managed\s+(?!\d+|team\s*of\s*\d+)',
+            r'led\s+(?!\d+|team\s*of\s*\d+)',
+            r'developed\s+(?!\d+)',
+            r'created\s+(?!\d+)'
+        ]
+        
+        return [
+            (pattern.split('\\')[0], re.compile(pattern, re.IGNORECASE))
+            for pattern in unquantified_patterns
         ]
     
     def analyze_resume_vs_job(self, resume_text: str, job_description: str) -> Dict:
         """
         Advanced analysis function that provides accurate ATS scoring like real systems
         """
+        key = (self._hash(resume_text), self._hash(job_description))
+        cached = self._cache.get(key)
+        if cached is not None:
+            # Callers get their own copy so the cached result stays intact
+            return copy.deepcopy(cached)
+        
+        result = self._analyze(resume_text, job_description)
+        self._cache.set(key, result)
+        return copy.deepcopy(result)
+    
+    def _analyze(self, resume_text: str, job_description: str) -> Dict:
+        """Run the full analysis without consulting the cache"""
         # Deep clean and process texts
-        resume_clean = self._advanced_text_cleaning(resume_text)
-        job_clean = self._advanced_text_cleaning(job_description)
+        # Lowercase once; both the cleaning and the formatting score use it
+        resume_lower = resume_text.lower()
+        resume_clean = self._advanced_text_cleaning(resume_lower)
+        job_clean, job_words, job_terms, job_keywords, job_industry, job_level = self._prepare_job(job_description)
         
-        # Extract sophisticated keyword sets
-        resume_keywords = self._extract_advanced_keywords(resume_clean)
-        job_keywords = self._extract_advanced_keywords(job_clean)
+        # Tokenize once; the word counts double as the resume's vocabulary
+        resume_words = resume_clean.split()
+        resume_word_counts = Counter(resume_words)
         
-        # Perform industry and role detection
-        job_industry = self._detect_industry(job_clean)
-        job_level = self._detect_experience_level(job_clean)
+        # Extract sophisticated keyword sets
+        resume_keywords = self._extract_advanced_keywords(resume_clean, resume_word_counts)
         
         # Advanced matching analysis
         keyword_matches = self._perform_advanced_matching(resume_keywords, job_keywords)
         missing_analysis = self._analyze_missing_keywords(resume_keywords, job_keywords, job_industry)
         
+        # Extract quantified achievements and impact metrics
+        quantified_achievements = self._extract_quantified_achievements(resume_clean)
+        impact_score = self._calculate_impact_score(resume_clean, quantified_achievements)
+        keyword_density = self._calculate_keyword_density(resume_word_counts.keys(), job_words)
+        
         # Comprehensive strength and weakness analysis
-        strengths = self._analyze_strengths(resume_clean, job_clean, keyword_matches)
-        weaknesses = self._analyze_weaknesses(resume_clean, job_clean, missing_analysis)
+        strengths = self._analyze_strengths(
+            resume_clean, job_terms, keyword_matches, quantified_achievements, keyword_density
+        )
+        weaknesses = self._analyze_weaknesses(resume_clean, job_clean, job_terms, missing_analysis)
+        
+        # Score components shared by the ATS score and the detailed analysis
+        industry_alignment = self._calculate_industry_alignment(resume_clean, job_industry)
+        experience_match = self._calculate_experience_match(resume_clean, job_level)
         
         # Calculate sophisticated ATS score
         ats_score = self._calculate_advanced_ats_score(
-            keyword_matches, missing_analysis, resume_clean, job_clean, job_industry, job_level
+            keyword_matches, missing_analysis, resume_clean, len(resume_words),
+            industry_alignment, experience_match, impact_score
         )
         
         # Generate actionable, non-BS suggestions
@@ -180,21 +407,17 @@ class ATSAnalyzer:
             strengths, weaknesses, missing_analysis, ats_score, job_industry
         )
         
-        # Extract quantified achievements and impact metrics
-        quantified_achievements = self._extract_quantified_achievements(resume_clean)
-        impact_score = self._calculate_impact_score(resume_clean)
-        
         return {
             'ats_score': round(ats_score, 1),
             'strong_keywords': [match.keyword for match in keyword_matches[:15]],
             'missing_keywords': missing_analysis['critical_missing'][:10],
             'suggestions': suggestions,
             'detailed_analysis': {
-                'keyword_density': self._calculate_keyword_density(resume_clean, job_clean),
-                'industry_alignment': self._calculate_industry_alignment(resume_clean, job_industry),
-                'experience_level_match': self._calculate_experience_match(resume_clean, job_level),
+                'keyword_density': keyword_density,
+                'industry_alignment': industry_alignment,
+                'experience_level_match': experience_match,
                 'quantification_score': impact_score,
-                'formatting_score': self._assess_resume_formatting(resume_text),
+                'formatting_score': self._assess_resume_formatting(resume_lower),
                 'strength_areas': [s.category for s in strengths.strong_technical_skills[:5]] if strengths.strong_technical_skills else [],
                 'weakness_areas': weaknesses.missing_hard_skills[:5],
                 'total_keywords_found': len(keyword_matches),
@@ -214,125 +437,95 @@ class ATSAnalyzer:
             }
         }
     
+    def _prepare_job(self, job_description: str) -> Tuple[str, Set[str], Set[str], Dict[str, Counter], str, str]:
+        """Clean a job description and detect its terms, keywords, industry and level"""
+        key = self._hash(job_description)
+        prepared = self._job_cache.get(key)
+        if prepared is None:
+            job_clean = self._advanced_text_cleaning(job_description.lower())
+            job_word_counts = Counter(job_clean.split())
+            
+            # Perform industry and role detection
+            prepared = (
+                job_clean,
+                frozenset(job_word_counts),
+                frozenset(term for term in self._job_scan_terms if term in job_clean),
+                self._extract_advanced_keywords(job_clean, job_word_counts),
+                self._detect_industry(job_clean),
+                self._detect_experience_level(job_clean)
+            )
+            self._job_cache.set(key, prepared)
+        return prepared
+    
     def _advanced_text_cleaning(self, text: str) -> str:
-        """Advanced text cleaning with better normalization"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Normalize common variations
-        text = re.sub(r'\bn\.?js\b', 'nodejs', text)
-        text = re.sub(r'\bc\+\+\b', 'cpp', text)
-        text = re.sub(r'\bc#\b', 'csharp', text)
-        text = re.sub(r'\b\.net\b', 'dotnet', text)
-        text = re.sub(r'\bai/ml\b', 'artificial intelligence machine learning', text)
-        text = re.sub(r'\bml/ai\b', 'machine learning artificial intelligence', text)
-        text = re.sub(r'\bui/ux\b', 'user interface user experience', text)
-        text = re.sub(r'\bci/cd\b', 'continuous integration continuous deployment', text)
-        
-        # Handle special characters and normalize spaces
-        text = re.sub(r'[^\w\s\-\./]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove extra whitespace
+        """Advanced text cleaning with better normalization (expects lowercased text)"""
+        # Normalize common variations in a single pass
+        text = self._normalization_re.sub(
+            lambda match: self._normalization_replacements[match.lastindex - 1], text
+        )
+        
+        # Handle special characters
+        text = self._special_chars_re.sub(' ', text)
+        
+        # Collapse all whitespace runs to single spaces
         text = ' '.join(text.split())
         
         return text
     
-    def _extract_advanced_keywords(self, text: str) -> Dict[str, List[str]]:
-        """Extract keywords with categorization and context"""
-        words = text.split()
-        
-        # Remove stop words and short words
-        filtered_words = [
-            word for word in words 
-            if word not in self.stop_words and len(word) > 2
-        ]
-        
+    def _extract_advanced_keywords(self, text: str, word_counts: Counter) -> Dict[str, Counter]:
+        """Extract keywords with categorization and context, counted per category"""
         # Extract multi-word technical terms
         multiword_terms = self._extract_multiword_technical_terms(text)
         
         # Categorize keywords by importance
-        categorized_keywords = defaultdict(list)
+        categorized_keywords = defaultdict(Counter)
+        
+        # Tokens with slash-separated parts split and trailing punctuation removed
+        tokens = {
+            part.strip('.-')
+            for word in word_counts
+            for part in word.split('/')
+        }
         
         # Process all skill categories
-        for category, skill_data in self.skill_categories.items():
-            keywords = skill_data['keywords']
-            weight = skill_data['weight']
+        for category, keywords, single_words, phrases in self._category_lookups:
+            found = tokens.intersection(single_words)
+            found.update(phrase for phrase in phrases if phrase in text)
             
-            for keyword in keywords:
-                if keyword in text:
-                    categorized_keywords[category].append(keyword)
+            # Keep the declaration order of the category's keywords
+            if found:
+                categorized_keywords[category] = Counter(k for k in keywords if k in found)
         
         # Add multiword terms
-        categorized_keywords['multiword_technical'] = multiword_terms
+        categorized_keywords['multiword_technical'] = Counter(multiword_terms)
         
         # Extract numbers and quantified metrics
         quantified_terms = self._extract_quantified_terms(text)
-        categorized_keywords['quantified'] = quantified_terms
+        categorized_keywords['quantified'] = Counter(quantified_terms)
         
-        # Get word frequency for remaining terms
-        word_freq = Counter(filtered_words)
-        common_words = [word for word, freq in word_freq.most_common(30)]
-        categorized_keywords['general'] = common_words
+        # Word frequency without stop words and short words, filtered over the
+        # distinct terms instead of every occurrence
+        word_freq = Counter({
+            word: count for word, count in word_counts.items()
+            if word not in self.stop_words and len(word) > 2
+        })
+        categorized_keywords['general'] = Counter(dict(word_freq.most_common(30)))
         
         return dict(categorized_keywords)
     
     def _extract_multiword_technical_terms(self, text: str) -> List[str]:
         """Extract sophisticated multi-word technical terms"""
-        technical_patterns = [
-            # Programming and Development
-            r'machine learning', r'deep learning', r'artificial intelligence',
-            r'data science', r'data analysis', r'data engineering',
-            r'web development', r'mobile development', r'software engineering',
-            r'full stack', r'front end', r'back end', r'frontend', r'backend',
-            r'cloud computing', r'cloud architecture', r'microservices',
-            
-            # Methodologies
-            r'agile development', r'scrum master', r'product owner',
-            r'test driven development', r'behavior driven development',
-            r'continuous integration', r'continuous deployment', r'devops',
-            
-            # Technologies
-            r'version control', r'source control', r'code review',
-            r'api development', r'rest api', r'graphql api',
-            r'database design', r'system architecture', r'network security',
-            
-            # Soft Skills
-            r'project management', r'team leadership', r'cross functional',
-            r'problem solving', r'critical thinking', r'analytical skills',
-            r'communication skills', r'presentation skills',
-            
-            # Industry Terms
-            r'business intelligence', r'digital transformation',
-            r'user experience', r'user interface', r'customer experience',
-            r'product development', r'software architecture'
-        ]
-        
-        terms = []
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, text)
-            terms.extend(matches)
-        
-        return list(set(terms))
+        # The terms are plain phrases, so a substring search per term is
+        # much cheaper than running a regex scan for each of them
+        return [term for term in self.multiword_technical_terms if term in text]
     
     def _extract_quantified_terms(self, text: str) -> List[str]:
         """Extract quantified achievements and metrics"""
-        quantified_patterns = [
-            r'\d+%\s*(?:improvement|increase|decrease|reduction|growth)',
-            r'\$\d+(?:,\d+)*(?:k|m|million|billion)?',
-            r'\d+(?:,\d+)*\s*(?:users|customers|clients|projects|applications)',
-            r'\d+(?:\.\d+)?x\s*(?:faster|improvement|increase)',
-            r'reduced.*by\s*\d+%',
-            r'increased.*by\s*\d+%',
-            r'improved.*by\s*\d+%',
-            r'\d+\s*(?:years?|months?)\s*(?:experience|exp)',
-            r'managed\s*\d+\s*(?:people|team|members)',
-            r'led\s*\d+\s*(?:people|team|members)'
-        ]
-        
         quantified = []
-        for pattern in quantified_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for required, pattern in self._quantified_patterns:
+            if required and required not in text:
+                continue
+            matches = pattern.findall(text)
             quantified.extend(matches)
         
         return list(set(quantified))
@@ -344,27 +537,36 @@ class ATSAnalyzer:
         # Match across all categories
         for category in job_keywords:
             if category in resume_keywords:
-                job_terms = job_keywords[category]
-                resume_terms = resume_keywords[category]
+                job_counts = job_keywords[category]
+                resume_counts = resume_keywords[category]
                 
-                for job_term in job_terms:
-                    for resume_term in resume_terms:
-                        similarity = self._calculate_similarity(job_term, resume_term)
-                        if similarity >= 0.8:  # High similarity threshold
-                            importance = self._get_keyword_importance(job_term, category)
-                            
-                            match = KeywordMatch(
-                                keyword=job_term,
-                                frequency_resume=resume_terms.count(resume_term),
-                                frequency_job=job_terms.count(job_term),
-                                importance_score=importance * similarity,
-                                context_matches=[resume_term],
-                                category=category
-                            )
-                            matches.append(match)
-        
-        # Sort by importance score
-        matches.sort(key=lambda x: x.importance_score, reverse=True)
+                for job_term, job_frequency in job_counts.items():
+                    # Exact matches are a hash lookup. Related terms, where one
+                    # contains the other, are still found by checking every
+                    # distinct resume term in the category
+                    related = [(job_term, 1.0)] if job_term in resume_counts else []
+                    related.extend(
+                        (resume_term, 0.9) for resume_term in resume_counts
+                        if resume_term != job_term and (job_term in resume_term or resume_term in job_term)
+                    )
+                    if not related:
+                        continue
+                    
+                    importance = self._get_keyword_importance(job_term, category)
+                    for resume_term, similarity in related:
+                        match = KeywordMatch(
+                            keyword=job_term,
+                            frequency_resume=resume_counts[resume_term],
+                            frequency_job=job_frequency,
+                            importance_score=importance * similarity,
+                            context_matches=[resume_term],
+                            category=category
+                        )
+                        matches.append(match)
+        
+        # Sort by importance score; the full list is kept because the match
+        # count and the per-category strengths are taken from all matches
+        matches.sort(key=attrgetter('importance_score'), reverse=True)
         return matches
     
     def _analyze_missing_keywords(self, resume_keywords: Dict, job_keywords: Dict, industry: str) -> Dict:
@@ -375,7 +577,7 @@ class ATSAnalyzer:
         
         for category, job_terms in job_keywords.items():
             resume_terms = resume_keywords.get(category, [])
-            weight = self.skill_categories.get(category, {}).get('weight', 0.5)
+            weight = self._category_weights.get(category, 0.5)
             
             for term in job_terms:
                 if not self._is_term_covered(term, resume_terms):
@@ -394,7 +596,8 @@ class ATSAnalyzer:
             'nice_to_have_missing': nice_to_have_missing[:5]
         }
     
-    def _analyze_strengths(self, resume_text: str, job_text: str, matches: List[KeywordMatch]) -> StrengthAnalysis:
+    def _analyze_strengths(self, resume_text: str, job_terms: Set[str], matches: List[KeywordMatch],
+                           achievements: List[str], keyword_density: float) -> StrengthAnalysis:
         """Analyze resume strengths in detail"""
         # Technical skill strengths
         technical_matches = [m for m in matches if m.category in ['critical_technical', 'important_technical']]
@@ -403,13 +606,7 @@ class ATSAnalyzer:
         experience_matches = [m for m in matches if m.category in ['methodologies', 'frameworks_libraries']]
         
         # Education advantages
-        education_keywords = self._extract_education_advantages(resume_text, job_text)
-        
-        # Quantified achievements
-        achievements = self._extract_quantified_achievements(resume_text)
-        
-        # Calculate keyword density
-        keyword_density = self._calculate_keyword_density(resume_text, job_text)
+        education_keywords = self._extract_education_advantages(resume_text, job_terms)
         
         return StrengthAnalysis(
             strong_technical_skills=technical_matches[:10],
@@ -419,17 +616,18 @@ class ATSAnalyzer:
             keyword_density_score=keyword_density
         )
     
-    def _analyze_weaknesses(self, resume_text: str, job_text: str, missing_analysis: Dict) -> WeaknessAnalysis:
+    def _analyze_weaknesses(self, resume_text: str, job_text: str, job_terms: Set[str],
+                            missing_analysis: Dict) -> WeaknessAnalysis:
         """Analyze resume weaknesses comprehensively"""
         # Missing skills analysis
         missing_hard = missing_analysis['critical_missing'] + missing_analysis['important_missing']
-        missing_soft = self._identify_missing_soft_skills(resume_text, job_text)
+        missing_soft = self._identify_missing_soft_skills(resume_text, job_terms)
         
         # Experience gaps
-        experience_gaps = self._identify_experience_gaps(resume_text, job_text)
+        experience_gaps = self._identify_experience_gaps(resume_text, job_text, job_terms)
         
         # Education gaps
-        education_gaps = self._identify_education_gaps(resume_text, job_text)
+        education_gaps = self._identify_education_gaps(resume_text, job_terms)
         
         # Formatting issues
         formatting_issues = self._assess_formatting_issues(resume_text)
@@ -446,60 +644,9 @@ class ATSAnalyzer:
             quantification_gaps=quantification_gaps[:5]
         )
     
-    def _analyze_strengths(self, resume_text: str, job_text: str, matches: List[KeywordMatch]) -> StrengthAnalysis:
-        """Analyze resume strengths in detail"""
-        # Technical skill strengths
-        technical_matches = [m for m in matches if m.category in ['critical_technical', 'important_technical']]
-        
-        # Experience matches
-        experience_matches = [m for m in matches if m.category in ['methodologies', 'frameworks_libraries']]
-        
-        # Education advantages
-        education_keywords = self._extract_education_advantages(resume_text, job_text)
-        
-        # Quantified achievements
-        achievements = self._extract_quantified_achievements(resume_text)
-        
-        # Calculate keyword density
-        keyword_density = self._calculate_keyword_density(resume_text, job_text)
-        
-        return StrengthAnalysis(
-            strong_technical_skills=technical_matches[:10],
-            strong_experience_matches=experience_matches[:5],
-            education_advantages=education_keywords,
-            quantified_achievements=achievements,
-            keyword_density_score=keyword_density
-        )
-    
-    def _analyze_weaknesses(self, resume_text: str, job_text: str, missing_analysis: Dict) -> WeaknessAnalysis:
-        """Analyze resume weaknesses comprehensively"""
-        # Missing skills analysis
-        missing_hard = missing_analysis['critical_missing'] + missing_analysis['important_missing']
-        missing_soft = self._identify_missing_soft_skills(resume_text, job_text)
-        
-        # Experience gaps
-        experience_gaps = self._identify_experience_gaps(resume_text, job_text)
-        
-        # Education gaps
-        education_gaps = self._identify_education_gaps(resume_text, job_text)
-        
-        # Formatting issues
-        formatting_issues = self._assess_formatting_issues(resume_text)
-        
-        # Quantification gaps
-        quantification_gaps = self._identify_quantification_gaps(resume_text)
-        
-        return WeaknessAnalysis(
-            missing_hard_skills=missing_hard[:8],
-            missing_soft_skills=missing_soft[:5],
-            weak_experience_areas=experience_gaps[:5],
-            missing_education_keywords=education_gaps[:3],
-            formatting_issues=formatting_issues[:3],
-            quantification_gaps=quantification_gaps[:5]
-        )
-    
-    def _calculate_advanced_ats_score(self, matches: List[KeywordMatch], missing: Dict, 
-                                    resume_text: str, job_text: str, industry: str, level: str) -> float:
+    def _calculate_advanced_ats_score(self, matches: List[KeywordMatch], missing: Dict, resume_text: str,
+                                    word_count: int, industry_alignment: float, experience_match: float,
+                                    impact: float) -> float:
         """Calculate sophisticated ATS score like real systems"""
         if not matches:
             return 0.0
@@ -508,16 +655,17 @@ class ATSAnalyzer:
         keyword_score = sum(match.importance_score for match in matches[:20]) / 20 * 40
         
         # Industry alignment score (25% weight)
-        industry_score = self._calculate_industry_alignment(resume_text, industry) * 25
+        industry_score = industry_alignment * 25
         
         # Experience level match score (20% weight)
-        experience_score = self._calculate_experience_match(resume_text, level) * 20
+        experience_score = experience_match * 20
         
         # Quantification and impact score (10% weight)
-        impact_score = self._calculate_impact_score(resume_text) * 10
+        impact_score = impact * 10
         
         # Formatting and structure score (5% weight)
-        format_score = self._assess_resume_formatting(resume_text) * 5
+        # The cleaned text is already lowercase and tokenized
+        format_score = self._score_formatting(resume_text, word_count) * 5
         
         # Penalty for critical missing keywords
         critical_penalty = len(missing['critical_missing']) * 3
@@ -578,13 +726,15 @@ class ATSAnalyzer:
     # Helper methods for advanced analysis
     def _detect_industry(self, job_text: str) -> str:
         """Detect job industry from description"""
-        industry_scores = {}
+        best_industry, best_score = 'general', -1
         
+        # Track the best score while scanning; ties keep the first industry
         for industry, keywords in self.industry_patterns.items():
             score = sum(1 for keyword in keywords if keyword in job_text)
-            industry_scores[industry] = score
+            if score > best_score:
+                best_industry, best_score = industry, score
         
-        return max(industry_scores, key=industry_scores.get) if industry_scores else 'general'
+        return best_industry
     
     def _detect_experience_level(self, job_text: str) -> str:
         """Detect required experience level"""
@@ -599,35 +749,24 @@ class ATSAnalyzer:
             return 1.0
         if term1 in term2 or term2 in term1:
             return 0.9
-        
-        # Simple character-based similarity
-        common_chars = set(term1) & set(term2)
-        total_chars = set(term1) | set(term2)
-        
-        return len(common_chars) / len(total_chars) if total_chars else 0.0
+        return 0.0
     
     def _get_keyword_importance(self, keyword: str, category: str) -> float:
         """Get importance weight for a keyword"""
-        base_weight = self.skill_categories.get(category, {}).get('weight', 0.5)
+        base_weight = self._category_weights.get(category, 0.5)
         
         # Boost importance for critical technical terms
-        if keyword in ['python', 'java', 'javascript', 'react', 'aws', 'docker', 'kubernetes']:
+        if keyword in self._boosted_keywords:
             return min(1.0, base_weight + 0.2)
         
         return base_weight
     
     def _is_term_covered(self, term: str, resume_terms: List[str]) -> bool:
-        """Check if term is covered in resume with fuzzy matching"""
-        for resume_term in resume_terms:
-            if self._calculate_similarity(term, resume_term) >= 0.8:
-                return True
-        return False
+        """Check if term is covered in resume, directly or as part of a longer term"""
+        return any(term in resume_term or resume_term in term for resume_term in resume_terms)
     
-    def _calculate_keyword_density(self, resume_text: str, job_text: str) -> float:
+    def _calculate_keyword_density(self, resume_words: Set[str], job_words: Set[str]) -> float:
         """Calculate keyword density score"""
-        job_words = set(job_text.split())
-        resume_words = set(resume_text.split())
-        
         if not job_words:
             return 0.0
             
@@ -654,10 +793,14 @@ class ATSAnalyzer:
         
         return min(1.0, matches / len(level_indicators))
     
-    def _calculate_impact_score(self, resume_text: str) -> float:
+    def _calculate_impact_score(self, resume_text: str, quantified_achievements: List[str]) -> float:
         """Calculate impact and quantification score"""
         # Count quantified achievements
-        quantified_count = len(self._extract_quantified_achievements(resume_text))
+        quantified_count = len(quantified_achievements)
+        
+        # Enough quantified achievements saturate the score on their own
+        if quantified_count * 0.7 >= 10:
+            return 1.0
         
         # Count impact verbs
         impact_count = sum(1 for verb in self.impact_verbs if verb in resume_text)
@@ -666,16 +809,19 @@ class ATSAnalyzer:
         total_score = (quantified_count * 0.7) + (impact_count * 0.3)
         return min(1.0, total_score / 10)  # Normalize to 0-1
     
-    def _assess_resume_formatting(self, resume_text: str) -> float:
-        """Assess resume formatting and structure"""
+    def _assess_resume_formatting(self, lowered_text: str) -> float:
+        """Assess resume formatting and structure from the lowercased raw text"""
+        return self._score_formatting(lowered_text, len(lowered_text.split()))
+    
+    def _score_formatting(self, lowered_text: str, word_count: int) -> float:
+        """Score formatting from lowercased text and its word count"""
         score = 1.0
         
         # Check for common sections
         sections = ['experience', 'education', 'skills', 'projects']
-        section_score = sum(1 for section in sections if section in resume_text.lower())
+        section_score = sum(1 for section in sections if section in lowered_text)
         
         # Check text length (not too short, not too long)
-        word_count = len(resume_text.split())
         if word_count < 100:
             score -= 0.3
         elif word_count > 2000:
@@ -688,85 +834,56 @@ class ATSAnalyzer:
     
     def _extract_quantified_achievements(self, text: str) -> List[str]:
         """Extract quantified achievements from resume"""
-        patterns = [
-            r'\d+%\s*(?:improvement|increase|decrease|reduction|growth|faster|better)',
-            r'\$\d+(?:,\d+)*(?:k|m|million|billion)?',
-            r'\d+(?:,\d+)*\s*(?:users|customers|clients|projects|applications|systems)',
-            r'\d+(?:\.\d+)?x\s*(?:improvement|increase|faster|more)',
-            r'saved\s*\$?\d+(?:,\d+)*',
-            r'generated\s*\$?\d+(?:,\d+)*',
-            r'managed\s*\$?\d+(?:,\d+)*\s*budget',
-            r'team\s*of\s*\d+',
-            r'\d+\s*(?:award|certification|patent)',
-            r'ranked\s*#?\d+'
-        ]
-        
-        achievements = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            achievements.extend(matches)
+        achievements = set()
+        for pattern in self._achievement_patterns:
+            achievements.update(pattern.findall(text))
             
-        return list(set(achievements))
+        return list(achievements)
     
-    def _extract_education_advantages(self, resume_text: str, job_text: str) -> List[str]:
+    def _extract_education_advantages(self, resume_text: str, job_terms: Set[str]) -> List[str]:
         """Extract education-related advantages"""
-        education_terms = [
-            'bachelor', 'master', 'phd', 'mba', 'degree', 'university',
-            'college', 'certification', 'certified', 'diploma'
-        ]
-        
         advantages = []
-        for term in education_terms:
-            if term in resume_text and term in job_text:
+        for term in self.education_terms:
+            if term in job_terms and term in resume_text:
                 advantages.append(term)
                 
         return advantages
     
-    def _identify_missing_soft_skills(self, resume_text: str, job_text: str) -> List[str]:
+    def _identify_missing_soft_skills(self, resume_text: str, job_terms: Set[str]) -> List[str]:
         """Identify missing soft skills"""
-        job_soft_skills = []
-        resume_soft_skills = []
-        
         soft_skills = self.skill_categories['soft_skills']['keywords']
         
-        for skill in soft_skills:
-            if skill in job_text:
-                job_soft_skills.append(skill)
-            if skill in resume_text:
-                resume_soft_skills.append(skill)
-        
-        return [skill for skill in job_soft_skills if skill not in resume_soft_skills]
+        # Only skills the job asks for need to be looked up in the resume
+        return [skill for skill in soft_skills if skill in job_terms and skill not in resume_text]
     
-    def _identify_experience_gaps(self, resume_text: str, job_text: str) -> List[str]:
+    def _identify_experience_gaps(self, resume_text: str, job_text: str, job_terms: Set[str]) -> List[str]:
         """Identify experience-related gaps"""
-        # Extract years of experience mentioned in job
-        job_years = re.findall(r'(\d+)\+?\s*years?', job_text)
-        resume_years = re.findall(r'(\d+)\+?\s*years?', resume_text)
+        # Only the first years-of-experience figure on each side is compared
+        job_years = self._years_re.search(job_text)
+        resume_years = self._years_re.search(resume_text) if job_years else None
         
         gaps = []
         
         if job_years and resume_years:
-            required = int(job_years[0]) if job_years else 0
-            available = int(resume_years[0]) if resume_years else 0
+            required = int(job_years.group(1))
+            available = int(resume_years.group(1))
             
             if available < required:
                 gaps.append(f"Experience gap: {required - available} years short")
         
         # Check for specific experience types
-        experience_types = ['management', 'leadership', 'senior', 'architect', 'principal']
-        for exp_type in experience_types:
-            if exp_type in job_text and exp_type not in resume_text:
+        for exp_type in self.experience_types:
+            if exp_type in job_terms and exp_type not in resume_text:
                 gaps.append(f"Missing {exp_type} experience")
                 
         return gaps
     
-    def _identify_education_gaps(self, resume_text: str, job_text: str) -> List[str]:
+    def _identify_education_gaps(self, resume_text: str, job_terms: Set[str]) -> List[str]:
         """Identify education-related gaps"""
-        education_requirements = ['bachelor', 'master', 'phd', 'mba', 'degree']
         gaps = []
         
-        for req in education_requirements:
-            if req in job_text and req not in resume_text:
+        for req in self.education_requirements:
+            if req in job_terms and req not in resume_text:
                 gaps.append(f"Missing {req} degree requirement")
                 
         return gaps
@@ -775,22 +892,22 @@ class ATSAnalyzer:
         """Assess potential formatting issues"""
         issues = []
         
-        # Check for extremely long paragraphs
-        paragraphs = resume_text.split('\n')
-        long_paragraphs = [p for p in paragraphs if len(p.split()) > 50]
-        if len(long_paragraphs) > 3:
-            issues.append("Use bullet points instead of long paragraphs")
+        # Check for extremely long paragraphs; more than three can only exist
+        # with at least three line breaks, and only their count is needed
+        if resume_text.count('\n') >= 3:
+            long_paragraphs = sum(1 for p in resume_text.split('\n') if len(p.split()) > 50)
+            if long_paragraphs > 3:
+                issues.append("Use bullet points instead of long paragraphs")
         
         # Check for missing contact information patterns
-        if not re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text):
+        if not self._email_re.search(resume_text):
             issues.append("Add professional email address")
             
-        if not re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', resume_text):
+        if not self._phone_re.search(resume_text):
             issues.append("Include phone number")
             
-        # Check for weak action verbs
-        weak_verbs = ['responsible for', 'worked on', 'helped with', 'involved in']
-        if any(verb in resume_text.lower() for verb in weak_verbs):
+        # Check for weak action verbs (the cleaned text is already lowercase)
+        if any(verb in resume_text for verb in self.weak_verbs):
             issues.append("Replace weak verbs with strong action verbs")
             
         return issues
@@ -800,19 +917,12 @@ class ATSAnalyzer:
         gaps = []
         
         # Look for statements that could be quantified
-        unquantified_patterns = [
-            r'improved\s+(?!\d+%|by\s*\d+)',
-            r'increased\s+(?!\d+%|by\s*\d+)',
-            r'reduced\s+(?!\d+%|by\s*\d+)',
-            r'managed\s+(?!\d+|team\s*of\s*\d+)',
-            r'led\s+(?!\d+|team\s*of\s*\d+)',
-            r'developed\s+(?!\d+)',
-            r'created\s+(?!\d+)'
-        ]
-        
-        for pattern in unquantified_patterns:
-            if re.search(pattern, resume_text, re.IGNORECASE):
-                verb = pattern.split('\\')[0]
+        for verb, pattern in self._unquantified_patterns:
+            if pattern.search(resume_text):
                 gaps.append(f"Quantify '{verb}' achievements with specific numbers or percentages")
                 
-        return list(set(gaps))
\ No newline at end of file
+        return list(set(gaps))
+
+
+# Initialize global analyzer instance
+ats_analyzer = ATSAnalyzer()
\ No newline at end of file
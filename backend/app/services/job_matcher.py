@@ -4,13 +4,21 @@ from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import csr_matrix
 from fuzzywuzzy import fuzz
 import numpy as np
 import logging
 
+from app.core.cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 
+def _pretokenized(tokens: List[str]) -> List[str]:
+    """TF-IDF analyzer for documents that are already token lists."""
+    return tokens
+
+
 @dataclass
 class MatchScore:
     """Data class for compatibility matching scores."""
@@ -37,7 +45,35 @@ class JobMatcher:
             'education': 0.15,
             'keywords': 0.2
         }
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+        # Texts are tokenized once when a profile is prepared (profiles hold
+        # lowercased text already), so cached job profiles skip tokenization
+        # and each comparison only fits TF-IDF on the stored tokens. The
+        # tokenizer is stateless and safe to share between threads.
+        self.tokenize = TfidfVectorizer(stop_words='english', lowercase=False).build_analyzer()
+        
+        # Degree fields considered relevant, in priority order, together with
+        # the job terms that select them (tech, business, design)
+        self.field_mappings = (
+            (('software', 'developer', 'engineer', 'technology', 'programming'),
+             ('computer', 'software', 'information', 'engineering', 'technology', 'science')),
+            (('manager', 'business', 'sales', 'marketing', 'finance'),
+             ('business', 'management', 'administration', 'finance', 'economics')),
+            (('design', 'creative', 'visual', 'ui', 'ux'),
+             ('design', 'art', 'creative', 'visual', 'graphic'))
+        )
+        
+        # Degree keywords by level score, checked from the highest level down
+        self.degree_levels = (
+            (('phd', 'doctorate'), 100),
+            (('master', 'mba', 'ms', 'ma'), 90),
+            (('bachelor', 'bs', 'ba', 'bsc'), 80),
+            (('associate', 'diploma'), 60)
+        )
+        
+        # Process-local caches keyed by the 'cache_key' of the job/resume data,
+        # which is (id, version) so edits invalidate entries naturally
+        self._job_profiles = LRUCache(max_size=512)
+        self._match_scores = LRUCache(max_size=2048)
     
     def calculate_compatibility_score(
         self, 
@@ -45,23 +81,163 @@ class JobMatcher:
         job_data: Dict[str, Any]
     ) -> MatchScore:
         """Calculate comprehensive compatibility score between resume and job."""
+        cache_key = self._match_cache_key(resume_data, job_data)
+        if cache_key is not None:
+            match_score = self._match_scores.get(cache_key)
+            if match_score is not None:
+                return match_score
+        
+        match_score = self._score_prepared_resume(self._prepare_resume(resume_data), job_data)
         
-        # Extract relevant data
+        if cache_key is not None:
+            self._match_scores.set(cache_key, match_score)
+        return match_score
+    
+    def invalidate(self, resume_id: Optional[int] = None, job_id: Optional[int] = None) -> None:
+        """Drop cached results for an updated or deleted resume and/or job."""
+        if job_id is not None:
+            self._job_profiles.discard_where(lambda key: key[0] == job_id)
+            self._match_scores.discard_where(lambda key: key[1][0] == job_id)
+        if resume_id is not None:
+            self._match_scores.discard_where(lambda key: key[0][0] == resume_id)
+    
+    def _match_cache_key(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Optional[Tuple]:
+        """Build the match cache key, or None when either side is not cacheable."""
+        resume_key = resume_data.get('cache_key')
+        job_key = job_data.get('cache_key')
+        if resume_key is None or job_key is None:
+            return None
+        return (resume_key, job_key)
+    
+    def calculate_compatibility_batch(
+        self, 
+        resume_data: Dict[str, Any], 
+        jobs_data: List[Dict[str, Any]]
+    ) -> List[MatchScore]:
+        """Calculate compatibility scores for one resume against many jobs.
+        
+        The resume side is normalized once and reused for every job, and
+        cached results are reused where available.
+        """
+        resume_profile = None
+        match_scores = []
+        
+        for job_data in jobs_data:
+            cache_key = self._match_cache_key(resume_data, job_data)
+            match_score = self._match_scores.get(cache_key) if cache_key is not None else None
+            
+            if match_score is None:
+                if resume_profile is None:
+                    resume_profile = self._prepare_resume(resume_data)
+                match_score = self._score_prepared_resume(resume_profile, job_data)
+                if cache_key is not None:
+                    self._match_scores.set(cache_key, match_score)
+            
+            match_scores.append(match_score)
+        
+        return match_scores
+    
+    def _prepare_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and normalize the resume fields used for matching."""
         resume_skills = resume_data.get('skills', [])
-        resume_experience = resume_data.get('experience', [])
-        resume_education = resume_data.get('education', [])
         resume_text = resume_data.get('raw_text', '')
-        
+        resume_experience = resume_data.get('experience', [])
+        text_lower = resume_text.lower()
+        skills_lower = [skill.lower() for skill in resume_skills]
+        
+        return {
+            'data': resume_data,
+            'skills': resume_skills,
+            'skills_lower': skills_lower,
+            'skill_index': self._index_skills(resume_skills, skills_lower),
+            'experience': resume_experience,
+            'experience_tokens': [
+                self.tokenize(
+                    exp.get('title', '').lower() + ' ' + exp.get('description', '').lower() + ' ' +
+                    exp.get('company', '').lower()
+                )
+                for exp in resume_experience
+            ],
+            'degrees': [
+                self._score_degree(education.get('degree', '').lower())
+                for education in resume_data.get('education', [])
+            ],
+            'text_lower': text_lower,
+            'text_tokens': self.tokenize(text_lower)
+        }
+    
+    def prepare_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the normalized job features used for matching.
+        
+        Results are cached when ``job_data`` carries a ``cache_key`` (e.g. the
+        job id and its version), so each posting is normalized once
+        and reused across matching requests.
+        """
+        cache_key = job_data.get('cache_key')
+        if cache_key is None:
+            return self._build_job_profile(job_data)
+        
+        profile = self._job_profiles.get(cache_key)
+        if profile is None:
+            profile = self._build_job_profile(job_data)
+            self._job_profiles.set(cache_key, profile)
+        return profile
+    
+    def _build_job_profile(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and normalize the job fields used for matching."""
         job_skills = job_data.get('required_skills', []) + job_data.get('preferred_skills', [])
-        job_description = job_data.get('description', '')
-        job_requirements = job_data.get('requirements', '')
-        job_keywords = job_data.get('keywords', [])
+        title_lower = (job_data.get('title') or '').lower()
+        description = job_data.get('description') or ''
+        requirements = job_data.get('requirements') or ''
+        description_lower = description.lower()
+        requirements_lower = requirements.lower()
+        
+        # Look for degree requirements in job posting
+        degree_keywords = ['bachelor', 'master', 'phd', 'degree', 'diploma', 'certificate']
+        has_degree_requirement = any(
+            keyword in requirements_lower or keyword in description_lower for keyword in degree_keywords
+        )
+        
+        text_lower = (description + ' ' + requirements).lower()
+        experience_text_lower = title_lower + ' ' + description_lower
+        education_text_lower = requirements_lower + ' ' + description_lower
+        
+        return {
+            'data': job_data,
+            'skills': job_skills,
+            'skills_lower': [skill.lower() for skill in job_skills],
+            'keywords': job_data.get('keywords', []),
+            'keywords_lower': [keyword.lower() for keyword in job_data.get('keywords', [])],
+            'text_lower': text_lower,
+            'text_tokens': self.tokenize(text_lower),
+            'experience_tokens': self.tokenize(experience_text_lower),
+            'relevant_fields': self._detect_relevant_fields(education_text_lower),
+            'experience_level': (job_data.get('experience_level') or '').lower(),
+            'has_degree_requirement': has_degree_requirement
+        }
+    
+    def _score_prepared_resume(
+        self, 
+        resume_profile: Dict[str, Any], 
+        job_data: Dict[str, Any]
+    ) -> MatchScore:
+        """Score a prepared resume profile against a single job."""
+        job_profile = self.prepare_job(job_data)
+        tfidf_matrix = self._vectorize_texts(resume_profile, job_profile)
         
         # Calculate individual scores
-        skill_score, matched_skills, missing_skills = self._calculate_skill_score(resume_skills, job_skills)
-        experience_score = self._calculate_experience_score(resume_experience, job_data)
-        education_score = self._calculate_education_score(resume_education, job_data)
-        keyword_score = self._calculate_keyword_score(resume_text, job_description + ' ' + job_requirements, job_keywords)
+        skill_score, matched_skills, missing_skills = self._calculate_skill_score(
+            resume_profile['skills'], job_profile['skills'],
+            resume_profile['skills_lower'], job_profile['skills_lower'],
+            resume_profile['skill_index']
+        )
+        experience_score = self._calculate_experience_score(
+            resume_profile['experience'], job_profile, tfidf_matrix
+        )
+        education_score = self._calculate_education_score(resume_profile['degrees'], job_profile)
+        keyword_score = self._calculate_keyword_score(
+            resume_profile['text_lower'], job_profile['text_lower'], job_profile['keywords_lower'], tfidf_matrix
+        )
         
         # Calculate weighted overall score
         overall_score = (
@@ -74,7 +250,7 @@ class JobMatcher:
         # Generate insights
         strengths, weaknesses, recommendations = self._generate_insights(
             skill_score, experience_score, education_score, keyword_score,
-            matched_skills, missing_skills, resume_data, job_data
+            matched_skills, missing_skills, resume_profile['data'], job_data
         )
         
         return MatchScore(
@@ -90,10 +266,43 @@ class JobMatcher:
             recommendations=recommendations
         )
     
+    def _vectorize_texts(self, resume_profile: Dict[str, Any], job_profile: Dict[str, Any]):
+        """Fit TF-IDF once over every text compared for a resume/job pair.
+        
+        Rows are: resume text, job text, job experience text, then one row per
+        resume experience entry. Returns None when no terms can be extracted.
+        """
+        documents = [
+            resume_profile['text_tokens'],
+            job_profile['text_tokens'],
+            job_profile['experience_tokens']
+        ] + resume_profile['experience_tokens']
+        
+        # When no compared pair shares a single term every similarity is zero,
+        # which short or unrelated texts hit often; skip fitting in that case
+        job_experience_terms = set(job_profile['experience_tokens'])
+        shares_terms = not set(resume_profile['text_tokens']).isdisjoint(job_profile['text_tokens']) or any(
+            not job_experience_terms.isdisjoint(tokens) for tokens in resume_profile['experience_tokens']
+        )
+        if not shares_terms and any(documents):
+            return csr_matrix((len(documents), 1))
+        
+        # Fitting mutates the vectorizer, so each call uses its own instance
+        # rather than one shared by every request thread
+        vectorizer = TfidfVectorizer(analyzer=_pretokenized, max_features=1000)
+        try:
+            return vectorizer.fit_transform(documents)
+        except ValueError as e:
+            logger.error(f"Error vectorizing texts: {str(e)}")
+            return None
+    
     def _calculate_skill_score(
         self, 
         resume_skills: List[str], 
-        job_skills: List[str]
+        job_skills: List[str],
+        resume_skills_lower: Optional[List[str]] = None,
+        job_skills_lower: Optional[List[str]] = None,
+        resume_skill_index: Optional[Dict[str, str]] = None
     ) -> Tuple[float, List[str], List[str]]:
         """Calculate skill matching score with fuzzy matching."""
         if not job_skills:
@@ -107,24 +316,37 @@ class JobMatcher:
         skill_scores = []
         
         # Normalize skills for better matching
-        resume_skills_lower = [skill.lower() for skill in resume_skills]
-        job_skills_lower = [skill.lower() for skill in job_skills]
-        
-        for job_skill in job_skills:
-            job_skill_lower = job_skill.lower()
+        if resume_skills_lower is None:
+            resume_skills_lower = [skill.lower() for skill in resume_skills]
+        if job_skills_lower is None:
+            job_skills_lower = [skill.lower() for skill in job_skills]
+        
+        # Exact matches are resolved with a hash lookup; only the remaining
+        # job skills need the fuzzy scan over all resume skills.
+        if resume_skill_index is None:
+            resume_skill_index = self._index_skills(resume_skills, resume_skills_lower)
+        
+        for job_skill, job_skill_lower in zip(job_skills, job_skills_lower):
+            exact_match = resume_skill_index.get(job_skill_lower)
+            if exact_match is not None:
+                matched_skills.append(exact_match)
+                skill_scores.append(1.0)
+                continue
+            
             best_match_score = 0
             best_match = None
+            job_skill_len = len(job_skill_lower)
             
             # Find best matching resume skill using fuzzy matching
-            for resume_skill in resume_skills:
-                resume_skill_lower = resume_skill.lower()
+            for resume_skill, resume_skill_lower in zip(resume_skills, resume_skills_lower):
+                # The ratio can never exceed 2 * shorter / total length, so skip
+                # pairs whose lengths alone rule out a match or a better score
+                resume_skill_len = len(resume_skill_lower)
+                upper_bound = 200 * min(job_skill_len, resume_skill_len) / max(job_skill_len + resume_skill_len, 1)
+                if upper_bound < 79 or upper_bound < best_match_score:
+                    continue
                 
-                # Exact match
-                if job_skill_lower == resume_skill_lower:
-                    score = 100
-                # Fuzzy match
-                else:
-                    score = fuzz.ratio(job_skill_lower, resume_skill_lower)
+                score = fuzz.ratio(job_skill_lower, resume_skill_lower)
                 
                 if score > best_match_score:
                     best_match_score = score
@@ -146,124 +368,97 @@ class JobMatcher:
         
         return skill_score, matched_skills, missing_skills
     
+    def _index_skills(self, skills: List[str], skills_lower: List[str]) -> Dict[str, str]:
+        """Map each lowercased skill to the first original spelling."""
+        skill_index = {}
+        for skill, skill_lower in zip(skills, skills_lower):
+            skill_index.setdefault(skill_lower, skill)
+        return skill_index
+    
     def _calculate_experience_score(
         self, 
         resume_experience: List[Dict[str, str]], 
-        job_data: Dict[str, Any]
+        job_profile: Dict[str, Any],
+        tfidf_matrix=None
     ) -> float:
         """Calculate experience relevance score."""
         if not resume_experience:
             return 0.0
         
-        job_title = job_data.get('title', '').lower()
-        job_description = job_data.get('description', '').lower()
-        job_requirements = job_data.get('requirements', '').lower()
-        experience_level = job_data.get('experience_level', '').lower()
-        
-        # Extract keywords from job posting
-        job_keywords = self._extract_experience_keywords(job_title + ' ' + job_description + ' ' + job_requirements)
-        
-        total_score = 0
-        weight_sum = 0
-        
-        for exp in resume_experience:
-            exp_title = exp.get('title', '').lower()
-            exp_description = exp.get('description', '').lower()
-            exp_company = exp.get('company', '').lower()
-            
-            # Calculate relevance score for this experience
-            exp_text = exp_title + ' ' + exp_description + ' ' + exp_company
-            relevance_score = self._calculate_text_similarity(exp_text, job_title + ' ' + job_description)
-            
-            # Weight recent experience more heavily (simplified)
-            weight = 1.0  # Could be enhanced with actual date parsing
-            
-            total_score += relevance_score * weight
-            weight_sum += weight
-        
-        if weight_sum > 0:
-            experience_score = (total_score / weight_sum) * 100
+        if tfidf_matrix is not None:
+            # Score every experience entry against the job in one sparse product;
+            # entries are weighted equally (no date parsing yet)
+            relevance_scores = cosine_similarity(tfidf_matrix[3:], tfidf_matrix[2]).ravel()
+            experience_score = float(relevance_scores.mean()) * 100
         else:
             experience_score = 0
         
         # Adjust based on experience level requirement
-        experience_score = self._adjust_for_experience_level(experience_score, len(resume_experience), experience_level)
+        experience_score = self._adjust_for_experience_level(
+            experience_score, len(resume_experience), job_profile['experience_level']
+        )
         
         return min(experience_score, 100.0)
     
     def _calculate_education_score(
         self, 
-        resume_education: List[Dict[str, str]], 
-        job_data: Dict[str, Any]
+        resume_degrees: List[Tuple[str, int]], 
+        job_profile: Dict[str, Any]
     ) -> float:
-        """Calculate education relevance score."""
-        if not resume_education:
+        """Calculate education relevance score from (degree, level score) pairs."""
+        if not resume_degrees:
             return 50.0  # Neutral score if no education info
         
-        job_requirements = job_data.get('requirements', '').lower()
-        job_description = job_data.get('description', '').lower()
-        
-        # Look for degree requirements in job posting
-        degree_keywords = ['bachelor', 'master', 'phd', 'degree', 'diploma', 'certificate']
-        has_degree_requirement = any(keyword in job_requirements or keyword in job_description for keyword in degree_keywords)
-        
-        if not has_degree_requirement:
+        if not job_profile['has_degree_requirement']:
             return 100.0  # Full score if no specific education requirement
         
+        relevant_fields = job_profile['relevant_fields']
+        
         # Calculate education relevance
         max_score = 0
-        for education in resume_education:
-            degree = education.get('degree', '').lower()
-            
-            # Basic scoring based on degree level
-            if any(keyword in degree for keyword in ['phd', 'doctorate']):
-                score = 100
-            elif any(keyword in degree for keyword in ['master', 'mba', 'ms', 'ma']):
-                score = 90
-            elif any(keyword in degree for keyword in ['bachelor', 'bs', 'ba', 'bsc']):
-                score = 80
-            elif any(keyword in degree for keyword in ['associate', 'diploma']):
-                score = 60
-            else:
-                score = 40
-            
+        for degree, score in resume_degrees:
             # Bonus for relevant field
-            if self._is_relevant_field(degree, job_requirements + ' ' + job_description):
+            if score < 100 and self._is_relevant_field(degree, relevant_fields):
                 score += 20
             
             max_score = max(max_score, score)
         
         return min(max_score, 100.0)
     
+    def _score_degree(self, degree: str) -> Tuple[str, int]:
+        """Pair a lowercased degree with its basic level score."""
+        for keywords, score in self.degree_levels:
+            if any(keyword in degree for keyword in keywords):
+                return degree, score
+        return degree, 40
+    
     def _calculate_keyword_score(
         self, 
         resume_text: str, 
         job_text: str, 
-        job_keywords: List[str]
+        job_keywords: List[str],
+        tfidf_matrix=None
     ) -> float:
-        """Calculate keyword matching score using TF-IDF and cosine similarity."""
-        if not resume_text or not job_text:
+        """Calculate keyword matching score using TF-IDF and cosine similarity.
+        
+        All inputs are expected to be lowercased already; rows 0 and 1 of
+        ``tfidf_matrix`` hold the resume and job vectors.
+        """
+        if not resume_text or not job_text or tfidf_matrix is None:
             return 0.0
         
         try:
-            # Prepare texts
-            texts = [resume_text.lower(), job_text.lower()]
-            
-            # Calculate TF-IDF vectors
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-            
             # Calculate cosine similarity
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            similarity = self._calculate_text_similarity(tfidf_matrix[0], tfidf_matrix[1])
             
             base_score = similarity * 100
             
             # Bonus for specific job keywords
             if job_keywords:
                 keyword_matches = 0
-                resume_lower = resume_text.lower()
                 
                 for keyword in job_keywords:
-                    if keyword.lower() in resume_lower:
+                    if keyword in resume_text:
                         keyword_matches += 1
                 
                 keyword_bonus = (keyword_matches / len(job_keywords)) * 20
@@ -275,18 +470,9 @@ class JobMatcher:
             logger.error(f"Error calculating keyword score: {str(e)}")
             return 0.0
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity between two texts using TF-IDF."""
-        if not text1 or not text2:
-            return 0.0
-        
-        try:
-            texts = [text1.lower(), text2.lower()]
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return similarity
-        except:
-            return 0.0
+    def _calculate_text_similarity(self, vector1, vector2) -> float:
+        """Calculate cosine similarity between two precomputed TF-IDF rows."""
+        return cosine_similarity(vector1, vector2)[0][0]
     
     def _extract_experience_keywords(self, text: str) -> List[str]:
         """Extract experience-related keywords from job text."""
@@ -335,26 +521,16 @@ class JobMatcher:
         
         return score
     
-    def _is_relevant_field(self, degree: str, job_text: str) -> bool:
+    def _detect_relevant_fields(self, job_text: str) -> Tuple[str, ...]:
+        """Return the degree fields relevant to a job, or an empty tuple."""
+        for job_terms, degree_fields in self.field_mappings:
+            if any(term in job_text for term in job_terms):
+                return degree_fields
+        return ()
+    
+    def _is_relevant_field(self, degree: str, relevant_fields: Tuple[str, ...]) -> bool:
         """Check if the degree field is relevant to the job."""
-        # Define field mappings
-        tech_fields = ['computer', 'software', 'information', 'engineering', 'technology', 'science']
-        business_fields = ['business', 'management', 'administration', 'finance', 'economics']
-        design_fields = ['design', 'art', 'creative', 'visual', 'graphic']
-        
-        # Check for tech relevance
-        if any(field in job_text for field in ['software', 'developer', 'engineer', 'technology', 'programming']):
-            return any(field in degree for field in tech_fields)
-        
-        # Check for business relevance
-        if any(field in job_text for field in ['manager', 'business', 'sales', 'marketing', 'finance']):
-            return any(field in degree for field in business_fields)
-        
-        # Check for design relevance
-        if any(field in job_text for field in ['design', 'creative', 'visual', 'ui', 'ux']):
-            return any(field in degree for field in design_fields)
-        
-        return False
+        return any(field in degree for field in relevant_fields)
     
     def _generate_insights(
         self,
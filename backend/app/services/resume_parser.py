@@ -1,19 +1,60 @@
 import re
 import os
+import sys
+import copy
+import hashlib
+import importlib
+import importlib.util
+import subprocess
+import zipfile
+import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from PyPDF2 import PdfReader
 import logging
+from app.core.config import settings
+from app.core.cache import LRUCache
 
-# Simple fallback without NLTK/spaCy for basic functionality
+# PyMuPDF extracts PDF text much faster than PyPDF2, which remains the fallback
 try:
-    from docx import Document
-    DOCX_AVAILABLE = True
+    import fitz
+    PYMUPDF_AVAILABLE = True
 except ImportError:
-    DOCX_AVAILABLE = False
+    PYMUPDF_AVAILABLE = False
+
+# Simple fallback without NLTK/spaCy for basic functionality. spaCy is only
+# looked up here; it is imported when the model loads in the background.
+SPACY_AVAILABLE = importlib.util.find_spec("spacy") is not None
 
 logger = logging.getLogger(__name__)
 
+# WordprocessingML element names read from a DOCX file's document part
+DOCX_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_BODY = DOCX_NS + 'body'
+DOCX_PARAGRAPH = DOCX_NS + 'p'
+DOCX_RUN = DOCX_NS + 'r'
+DOCX_HYPERLINK = DOCX_NS + 'hyperlink'
+DOCX_TEXT = DOCX_NS + 't'
+# Run elements that stand for a fixed character
+DOCX_RUN_CHARACTERS = {
+    DOCX_NS + 'tab': '\t',
+    DOCX_NS + 'br': '\n',
+    DOCX_NS + 'cr': '\n',
+}
+
+# Only the NER component is used (PERSON fallback in name extraction), so the
+# rest of the pipeline is excluded at load time to save memory and per-doc work.
+# The NER component in the en_core_web_* models carries its own tok2vec layer.
+SPACY_EXCLUDED_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+# Extractors scan at most this many characters; real resumes are far shorter
+MAX_EXTRACTION_CHARS = 2000000
+
+# Extracted text whose leading sample is mostly unprintable is treated as
+# binary garbage from a failed extraction and skipped
+READABLE_SAMPLE_CHARS = 4096
+MIN_READABLE_RATIO = 0.7
+
 
 @dataclass
 class ExtractedInfo:
@@ -49,11 +90,67 @@ class ResumeParser:
     
     def __init__(self):
         """Initialize the parser with basic functionality."""
-        # Simplified initialization without spaCy
+        # Loaded in the background by load_nlp_model; until then name
+        # extraction uses the rule-based heuristics only
         self.nlp = None
         self.skills_database = self._load_skills_database()
+        self.word_pattern = re.compile(r'\w+')
+        self.skill_patterns = self._compile_skill_patterns()
+        self.languages = self._load_languages()
+        self.section_keywords = {
+            'education': ['education', 'academic', 'qualification'],
+            'experience': ['experience', 'work', 'employment', 'career'],
+            'projects': ['projects', 'project work', 'personal projects'],
+        }
+        self.section_boundaries = ['experience', 'education', 'skills', 'projects', 'certifications']
         self.degree_patterns = self._compile_degree_patterns()
         self.experience_patterns = self._compile_experience_patterns()
+        self.contact_patterns = self._compile_contact_patterns()
+        self.certification_patterns = self._compile_certification_patterns()
+        
+        # LRU cache of parse results keyed by file type and content digest,
+        # so re-uploads of the same file skip extraction entirely
+        self._cache = LRUCache(128)
+    
+    def load_nlp_model(self) -> None:
+        """Load the spaCy model, downloading it first if it is missing.
+        
+        This is slow, so the app runs it in a background thread at startup
+        rather than at import time or on the request path.
+        """
+        if not SPACY_AVAILABLE:
+            return
+        
+        import spacy
+        
+        # A copy saved in SPACY_MODEL_DIR (e.g. on a persistent volume) is
+        # loaded directly, so redeploys need neither the package nor a download
+        saved_path = os.path.join(settings.SPACY_MODEL_DIR, settings.SPACY_MODEL) if settings.SPACY_MODEL_DIR else None
+        load_saved = saved_path is not None and os.path.isdir(saved_path)
+        try:
+            nlp = spacy.load(saved_path if load_saved else settings.SPACY_MODEL, exclude=SPACY_EXCLUDED_COMPONENTS)
+        except OSError:
+            logger.info(f"Downloading spaCy model '{settings.SPACY_MODEL}'...")
+            try:
+                subprocess.run([sys.executable, "-m", "spacy", "download", settings.SPACY_MODEL],
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60)
+                # The model is a newly installed package
+                importlib.invalidate_caches()
+                nlp = spacy.load(settings.SPACY_MODEL, exclude=SPACY_EXCLUDED_COMPONENTS)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+                logger.warning(f"spaCy model '{settings.SPACY_MODEL}' not available, using rule-based parsing only")
+                return
+            load_saved = False
+        
+        if saved_path and not load_saved:
+            try:
+                nlp.to_disk(saved_path)
+            except OSError as e:
+                logger.warning(f"Could not save spaCy model to {saved_path}: {e}")
+        
+        self.nlp = nlp
+        # Results cached before the model was ready may lack NER-based names
+        self._cache.discard_where(lambda key: True)
     
     def _load_skills_database(self) -> Dict[str, List[str]]:
         """Load comprehensive skills database categorized by domain."""
@@ -95,6 +192,35 @@ class ResumeParser:
             ]
         }
     
+    def _load_languages(self) -> List[Tuple[str, str]]:
+        """Load common spoken languages with their lowercase search forms."""
+        language_list = [
+            'English', 'Spanish', 'French', 'German', 'Italian', 'Portuguese', 'Russian',
+            'Chinese', 'Japanese', 'Korean', 'Arabic', 'Hindi', 'Bengali', 'Urdu'
+        ]
+        return [(language, language.lower()) for language in language_list]
+    
+    def _compile_skill_patterns(self) -> List[Tuple[str, str, Optional[re.Pattern]]]:
+        """Compile a word-boundary pattern for each skill in the database.
+        
+        Single-word skills get no pattern: matching one between word boundaries
+        is the same as finding it among the text's words, a set lookup. A skill
+        listed under several categories is kept once, so matches need no dedupe.
+        """
+        skill_patterns = []
+        seen = set()
+        for skills in self.skills_database.values():
+            for skill in skills:
+                if skill in seen:
+                    continue
+                seen.add(skill)
+                skill_lower = skill.lower()
+                if self.word_pattern.fullmatch(skill_lower):
+                    skill_patterns.append((skill, skill_lower, None))
+                else:
+                    skill_patterns.append((skill, skill_lower, re.compile(r'\b' + re.escape(skill_lower) + r'\b')))
+        return skill_patterns
+    
     def _compile_degree_patterns(self) -> List[re.Pattern]:
         """Compile regex patterns for detecting educational qualifications."""
         degree_patterns = [
@@ -115,6 +241,35 @@ class ResumeParser:
         ]
         return [re.compile(pattern) for pattern in experience_patterns]
     
+    def _compile_contact_patterns(self) -> Dict[str, Any]:
+        """Compile regex patterns for email, phone and address extraction."""
+        address_patterns = [
+            r'\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)',
+            r'[A-Za-z\s]+,\s*[A-Z]{2}\s+\d{5}',  # City, State ZIP
+            r'[A-Za-z\s]+,\s*[A-Za-z\s]+\s+\d{5,6}'  # City, Country/State Postal
+        ]
+        return {
+            'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+            # Optional parentheses and separators also cover the bare
+            # "555-123-4567" and "5551234567" forms, so one pattern suffices
+            'phone': re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+            'address': [re.compile(pattern, re.IGNORECASE) for pattern in address_patterns]
+        }
+    
+    def _compile_certification_patterns(self) -> List[Tuple[re.Pattern, Tuple[str, ...]]]:
+        """Compile regex patterns for common certifications.
+        
+        Each pattern is paired with the lowercase keywords one of which any
+        match must contain, so patterns can be skipped with substring checks.
+        """
+        cert_patterns = [
+            (r'(?i)(AWS|Amazon Web Services)\s+(?:Certified\s+)?([A-Za-z\s]+)', ('aws', 'amazon web services')),
+            (r'(?i)(Microsoft|Google|Oracle|Cisco)\s+(?:Certified\s+)?([A-Za-z\s]+)', ('microsoft', 'google', 'oracle', 'cisco')),
+            (r'(?i)Certified\s+([A-Za-z\s]+)', ('certified',)),
+            (r'(?i)(PMP|CISSP|CISA|CISM|CompTIA)', ('pmp', 'cissp', 'cisa', 'cism', 'comptia')),
+        ]
+        return [(re.compile(pattern), keywords) for pattern, keywords in cert_patterns]
+    
     def extract_text_from_file(self, file_path: str) -> str:
         """Extract text from various file formats."""
         try:
@@ -137,43 +292,84 @@ class ResumeParser:
     def _extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file."""
         try:
+            if PYMUPDF_AVAILABLE:
+                with fitz.open(file_path) as doc:
+                    return "".join(page.get_text("text") + "\n" for page in doc)
+            
             with open(file_path, 'rb') as file:
                 pdf_reader = PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             return ""
     
     def _extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        if not DOCX_AVAILABLE:
-            logger.warning("python-docx not available. Cannot process DOCX files.")
-            return ""
-        
+        """Extract text from DOCX file by reading its document XML directly."""
         try:
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document:
+                body = ET.parse(document).getroot().find(DOCX_BODY)
+            if body is None:
+                return ""
+            return "".join(
+                self._docx_paragraph_text(paragraph) + "\n"
+                for paragraph in body.iterfind(DOCX_PARAGRAPH)
+            )
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
             return ""
     
+    def _docx_paragraph_text(self, paragraph: ET.Element) -> str:
+        """Join the text of a paragraph's runs, including runs inside hyperlinks."""
+        parts = []
+        for child in paragraph:
+            if child.tag == DOCX_RUN:
+                runs = (child,)
+            elif child.tag == DOCX_HYPERLINK:
+                runs = child.iterfind(DOCX_RUN)
+            else:
+                continue
+            for run in runs:
+                for element in run:
+                    if element.tag == DOCX_TEXT:
+                        parts.append(element.text or '')
+                    elif element.tag in DOCX_RUN_CHARACTERS:
+                        parts.append(DOCX_RUN_CHARACTERS[element.tag])
+        return ''.join(parts)
+    
     def parse_resume(self, file_path: str) -> Dict[str, Any]:
         """Main method to parse resume and extract structured information."""
-        text = self.extract_text_from_file(file_path)
-        if not text:
+        try:
+            with open(file_path, 'rb') as file:
+                digest = hashlib.blake2b(file.read(), digest_size=16).digest()
+        except OSError:
+            # Unreadable files are left to the extractors to report
+            return self._parse(file_path)
+        
+        key = (os.path.splitext(file_path)[1].lower(), digest)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._parse(file_path)
+            self._cache.set(key, cached)
+        
+        # Callers get their own copy so the cached result stays intact
+        return copy.deepcopy(cached)
+    
+    def _parse(self, file_path: str) -> Dict[str, Any]:
+        """Parse a resume file without consulting the cache."""
+        raw_text = self.extract_text_from_file(file_path)
+        if not raw_text.strip() or not self._is_readable_text(raw_text):
             return {
                 'raw_text': '',
                 'extracted_info': ExtractedInfo()
             }
         
+        text = raw_text[:MAX_EXTRACTION_CHARS]
         extracted_info = ExtractedInfo()
         
+        # Lowercase once for every case-insensitive extractor
+        text_lower = text.lower()
+        sections = self._find_sections(text)
+        
         # Extract basic contact information
         extracted_info.name = self._extract_name(text)
         extracted_info.email = self._extract_email(text)
@@ -181,39 +377,44 @@ class ResumeParser:
         extracted_info.address = self._extract_address(text)
         
         # Extract skills
-        extracted_info.skills = self._extract_skills(text)
+        extracted_info.skills = self._extract_skills(text_lower)
         
         # Extract education
-        extracted_info.education = self._extract_education(text)
+        extracted_info.education = self._extract_education(sections['education'])
         
         # Extract work experience
-        extracted_info.experience = self._extract_experience(text)
+        extracted_info.experience = self._extract_experience(sections['experience'])
         
         # Extract certifications
-        extracted_info.certifications = self._extract_certifications(text)
+        extracted_info.certifications = self._extract_certifications(text, text_lower)
         
         # Extract languages
-        extracted_info.languages = self._extract_languages(text)
+        extracted_info.languages = self._extract_languages(text_lower)
         
         # Extract projects
-        extracted_info.projects = self._extract_projects(text)
+        extracted_info.projects = self._extract_projects(sections['projects'])
         
         return {
-            'raw_text': text,
+            'raw_text': raw_text,
             'extracted_info': extracted_info
         }
     
+    def _is_readable_text(self, text: str) -> bool:
+        """Check that the start of the text is mostly printable characters."""
+        sample = text[:READABLE_SAMPLE_CHARS]
+        readable = sum(1 for char in sample if char.isprintable() or char.isspace())
+        return readable >= MIN_READABLE_RATIO * len(sample)
+    
     def _extract_name(self, text: str) -> Optional[str]:
         """Extract person's name from resume text."""
-        lines = text.split('\n')
+        lines = text.split('\n', 5)
         
         # Look for name in first few lines
-        for i, line in enumerate(lines[:5]):
-            line = line.strip()
-            if len(line) > 0 and len(line.split()) <= 4:
-                # Check if line looks like a name (no special characters, proper length)
-                if re.match(r'^[A-Za-z\s.]+$', line) and 2 <= len(line.split()) <= 4:
-                    return line.title()
+        for line in lines[:5]:
+            words = line.split()
+            # Check if line looks like a name (no special characters, proper length)
+            if 2 <= len(words) <= 4 and self._is_name_line(words):
+                return line.strip().title()
         
         # Use NLP to find person names
         if self.nlp:
@@ -224,66 +425,51 @@ class ResumeParser:
         
         return None
     
+    def _is_name_line(self, words: List[str]) -> bool:
+        """Check that a line's words hold only ASCII letters and periods."""
+        letters = ''.join(words).replace('.', '')
+        return not letters or (letters.isascii() and letters.isalpha())
+    
     def _extract_email(self, text: str) -> Optional[str]:
         """Extract email address from resume text."""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return emails[0] if emails else None
+        match = self.contact_patterns['email'].search(text)
+        return match.group(0) if match else None
     
     def _extract_phone(self, text: str) -> Optional[str]:
         """Extract phone number from resume text."""
-        phone_patterns = [
-            r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'(\+\d{1,3}[-.\s]?)?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'(\+\d{1,3}[-.\s]?)?\d{10}'
-        ]
-        
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, text)
-            if phones:
-                return phones[0] if isinstance(phones[0], str) else ''.join(phones[0])
-        
-        return None
+        match = self.contact_patterns['phone'].search(text)
+        return match.group(0) if match else None
     
     def _extract_address(self, text: str) -> Optional[str]:
         """Extract address from resume text."""
         # Look for address patterns
-        address_patterns = [
-            r'\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)',
-            r'[A-Za-z\s]+,\s*[A-Z]{2}\s+\d{5}',  # City, State ZIP
-            r'[A-Za-z\s]+,\s*[A-Za-z\s]+\s+\d{5,6}'  # City, Country/State Postal
-        ]
-        
-        for pattern in address_patterns:
-            addresses = re.findall(pattern, text, re.IGNORECASE)
-            if addresses:
-                return addresses[0]
+        for pattern in self.contact_patterns['address']:
+            match = pattern.search(text)
+            if match:
+                return match.group(0)
         
         return None
     
-    def _extract_skills(self, text: str) -> List[str]:
-        """Extract skills from resume text."""
-        found_skills = []
-        text_lower = text.lower()
-        
-        # Check against skills database
-        for category, skills in self.skills_database.items():
-            for skill in skills:
-                # Use word boundaries to avoid partial matches
-                pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-                if re.search(pattern, text_lower):
-                    found_skills.append(skill)
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(found_skills))
+    def _extract_skills(self, text_lower: str) -> List[str]:
+        """Extract skills from lowercased resume text."""
+        words = set(self.word_pattern.findall(text_lower))
+        
+        # Check against skills database, using word boundaries to avoid partial
+        # matches. Single-word skills are looked up among the words. For the
+        # rest, a plain substring search rules most skills out far faster than
+        # the regex, which only confirms candidates. (A single alternation regex
+        # over all skills was measured slower, and it cannot report overlapping
+        # skills such as 'React' in 'React Native'.)
+        return [
+            skill for skill, skill_lower, pattern in self.skill_patterns
+            if (skill_lower in words if pattern is None
+                else skill_lower in text_lower and pattern.search(text_lower))
+        ]
     
-    def _extract_education(self, text: str) -> List[Dict[str, str]]:
-        """Extract education information from resume text."""
+    def _extract_education(self, education_section: str) -> List[Dict[str, str]]:
+        """Extract education information from the resume's education section."""
         education = []
         
-        # Find education section
-        education_section = self._find_section(text, ['education', 'academic', 'qualification'])
-        
         if education_section:
             for pattern in self.degree_patterns:
                 matches = pattern.findall(education_section)
@@ -300,17 +486,15 @@ class ResumeParser:
         
         return education
     
-    def _extract_experience(self, text: str) -> List[Dict[str, str]]:
-        """Extract work experience from resume text."""
+    def _extract_experience(self, experience_section: str) -> List[Dict[str, str]]:
+        """Extract work experience from the resume's experience section."""
         experience = []
         
-        # Find experience section
-        experience_section = self._find_section(text, ['experience', 'work', 'employment', 'career'])
-        
         if experience_section:
             # Split by common delimiters and extract job entries
             lines = experience_section.split('\n')
             current_job = {}
+            description_lines = []
             
             for line in lines:
                 line = line.strip()
@@ -320,72 +504,61 @@ class ResumeParser:
                 # Look for job titles (lines that might be job titles)
                 if self._looks_like_job_title(line):
                     if current_job:
-                        experience.append(current_job)
+                        experience.append(self._with_description(current_job, description_lines))
                     current_job = {'title': line, 'company': '', 'duration': '', 'description': ''}
+                    description_lines = []
                 elif current_job and not current_job.get('company'):
                     # Next line might be company
                     current_job['company'] = line
                 elif current_job:
                     # Add to description
-                    current_job['description'] += line + ' '
+                    description_lines.append(line)
             
             if current_job:
-                experience.append(current_job)
+                experience.append(self._with_description(current_job, description_lines))
         
         return experience
     
-    def _extract_certifications(self, text: str) -> List[str]:
+    def _extract_certifications(self, text: str, text_lower: str) -> List[str]:
         """Extract certifications from resume text."""
         certifications = []
+        seen = set()
         
-        # Common certification patterns
-        cert_patterns = [
-            r'(?i)(AWS|Amazon Web Services)\s+(?:Certified\s+)?([A-Za-z\s]+)',
-            r'(?i)(Microsoft|Google|Oracle|Cisco)\s+(?:Certified\s+)?([A-Za-z\s]+)',
-            r'(?i)Certified\s+([A-Za-z\s]+)',
-            r'(?i)(PMP|CISSP|CISA|CISM|CompTIA)',
-        ]
+        # Case-insensitive matching only reduces to lowercase substrings for
+        # ASCII text; other text (e.g. with 'ſ' or the Kelvin sign) runs every pattern
+        prefilter = text.isascii()
         
-        for pattern in cert_patterns:
-            matches = re.findall(pattern, text)
+        # Common certification patterns, keeping the first occurrence of each
+        for pattern, keywords in self.certification_patterns:
+            if prefilter and not any(keyword in text_lower for keyword in keywords):
+                continue
+            matches = pattern.findall(text)
             for match in matches:
                 if isinstance(match, tuple):
                     cert = ' '.join(match).strip()
                 else:
                     cert = match.strip()
-                if cert:
+                if cert and cert not in seen:
+                    seen.add(cert)
                     certifications.append(cert)
         
-        return list(set(certifications))  # Remove duplicates
+        return certifications
     
-    def _extract_languages(self, text: str) -> List[str]:
-        """Extract languages from resume text."""
-        languages = []
-        
-        # Common languages
-        language_list = [
-            'English', 'Spanish', 'French', 'German', 'Italian', 'Portuguese', 'Russian',
-            'Chinese', 'Japanese', 'Korean', 'Arabic', 'Hindi', 'Bengali', 'Urdu'
-        ]
-        
-        text_lower = text.lower()
-        for language in language_list:
-            if language.lower() in text_lower:
-                languages.append(language)
-        
-        return languages
+    def _extract_languages(self, text_lower: str) -> List[str]:
+        """Extract languages from lowercased resume text."""
+        # Substring search, as before: a word-set lookup would stop matching
+        # languages inside longer words such as 'englishman' or 'germany'
+        return [language for language, language_lower in self.languages if language_lower in text_lower]
     
-    def _extract_projects(self, text: str) -> List[Dict[str, str]]:
-        """Extract project information from resume text."""
+    def _extract_projects(self, projects_section: str) -> List[Dict[str, str]]:
+        """Extract project information from the resume's projects section."""
         projects = []
         
-        # Find projects section
-        projects_section = self._find_section(text, ['projects', 'project work', 'personal projects'])
-        
         if projects_section:
             # This is a simplified extraction - could be enhanced
             lines = projects_section.split('\n')
             current_project = {}
+            description_lines = []
             
             for line in lines:
                 line = line.strip()
@@ -394,44 +567,54 @@ class ResumeParser:
                 
                 if self._looks_like_project_title(line):
                     if current_project:
-                        projects.append(current_project)
+                        projects.append(self._with_description(current_project, description_lines))
                     current_project = {'title': line, 'description': '', 'technologies': ''}
+                    description_lines = []
                 elif current_project:
-                    current_project['description'] += line + ' '
+                    description_lines.append(line)
             
             if current_project:
-                projects.append(current_project)
+                projects.append(self._with_description(current_project, description_lines))
         
         return projects
     
-    def _find_section(self, text: str, section_keywords: List[str]) -> str:
-        """Find and extract a specific section from resume text."""
-        lines = text.split('\n')
-        section_start = -1
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            for keyword in section_keywords:
-                if keyword in line_lower and len(line_lower) < 50:  # Likely a section header
-                    section_start = i
+    def _with_description(self, entry: Dict[str, str], description_lines: List[str]) -> Dict[str, str]:
+        """Set an entry's description from its collected lines in one join."""
+        entry['description'] = ''.join(line + ' ' for line in description_lines)
+        return entry
+    
+    def _find_sections(self, text: str) -> Dict[str, str]:
+        """Find the education, experience and projects sections in one scan of the lines."""
+        # Section headers are short, non-empty lines; check each one for section
+        # keywords and boundaries once, so every section search only walks these.
+        # Lines are tracked by their start offset so sections can be sliced out
+        # of the text directly.
+        headers = []
+        line_start = 0
+        for line in text.split('\n'):
+            stripped = line.strip()
+            # Lowercasing never shortens a line, so long lines need not be lowered
+            if stripped and len(stripped) < 50:
+                stripped = stripped.lower()
+                if len(stripped) < 50:
+                    is_boundary = any(keyword in stripped for keyword in self.section_boundaries)
+                    headers.append((line_start, stripped, is_boundary))
+            line_start += len(line) + 1
+        
+        sections = {}
+        for name, section_keywords in self.section_keywords.items():
+            sections[name] = ""
+            for position, (section_start, line, _) in enumerate(headers):
+                if any(keyword in line for keyword in section_keywords):
+                    # Section ends before the next header naming another section, or at end of text
+                    section_end = next(
+                        (start - 1 for start, _, is_boundary in headers[position + 1:] if is_boundary),
+                        len(text)
+                    )
+                    sections[name] = text[section_start:section_end]
                     break
-            if section_start != -1:
-                break
-        
-        if section_start == -1:
-            return ""
         
-        # Find section end (next section or end of text)
-        section_end = len(lines)
-        for i in range(section_start + 1, len(lines)):
-            line = lines[i].strip().lower()
-            # Check if this might be another section header
-            if (line and len(line) < 50 and 
-                any(keyword in line for keyword in ['experience', 'education', 'skills', 'projects', 'certifications'])):
-                section_end = i
-                break
-        
-        return '\n'.join(lines[section_start:section_end])
+        return sections
     
     def _looks_like_job_title(self, line: str) -> bool:
         """Heuristic to determine if a line looks like a job title."""
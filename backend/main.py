@@ -1,11 +1,14 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 from decouple import config
 import uvicorn
 import os
 import logging
+import threading
 
 # Import core modules
 from app.core.config import settings
@@ -15,51 +18,47 @@ from app.core.database import init_db
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import routes with error handling
-ESSENTIAL_ROUTES_AVAILABLE = False
-ADVANCED_ROUTES_AVAILABLE = False
-ANALYSIS_ROUTES_AVAILABLE = False
-
+# Import routes with error handling. Each group is imported exactly once, so a
+# missing optional dependency only costs the failed import of its own group.
 try:
-    from app.api.routes import auth, users, jobs, resumes, matching, analysis
-    ROUTES_AVAILABLE = True
+    from app.api.routes import auth, users
     ESSENTIAL_ROUTES_AVAILABLE = True
+except ImportError:
+    logger.error("Critical error: Cannot import essential routes")
+    ESSENTIAL_ROUTES_AVAILABLE = False
+
+try:
+    from app.api.routes import jobs, resumes, matching
     ADVANCED_ROUTES_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Advanced routes (jobs, resumes, matching) not available: {e}")
+    ADVANCED_ROUTES_AVAILABLE = False
+
+try:
+    from app.api.routes import analysis
     ANALYSIS_ROUTES_AVAILABLE = True
-    logger.info("All routes imported successfully")
+    logger.info("Analysis routes imported successfully")
 except ImportError as e:
-    logger.warning(f"Some routes may not be available due to missing dependencies: {e}")
-    # Import essential routes and try to import analysis separately
-    try:
-        from app.api.routes import auth, users
-        ESSENTIAL_ROUTES_AVAILABLE = True
-    except ImportError:
-        logger.error("Critical error: Cannot import essential routes")
-        ESSENTIAL_ROUTES_AVAILABLE = False
-    
-    # Try to import other routes individually
-    try:
-        from app.api.routes import jobs, resumes, matching
-        ADVANCED_ROUTES_AVAILABLE = True
-    except ImportError:
-        logger.warning("Advanced routes (jobs, resumes, matching) not available")
-        ADVANCED_ROUTES_AVAILABLE = False
-    
-    try:
-        from app.api.routes import analysis
-        ANALYSIS_ROUTES_AVAILABLE = True
-        logger.info("Analysis routes imported successfully")
-    except ImportError as e:
-        logger.warning(f"Analysis routes not available: {e}")
-        ANALYSIS_ROUTES_AVAILABLE = False
-    
-    ROUTES_AVAILABLE = False
+    logger.warning(f"Analysis routes not available: {e}")
+    ANALYSIS_ROUTES_AVAILABLE = False
+
+ROUTES_AVAILABLE = ESSENTIAL_ROUTES_AVAILABLE and ADVANCED_ROUTES_AVAILABLE and ANALYSIS_ROUTES_AVAILABLE
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    os.makedirs(settings.UPLOAD_DIRECTORY, exist_ok=True)
+    
+    # Load (and if needed download) the spaCy model without holding up the
+    # port; the parser falls back to rule-based parsing until it is ready
+    try:
+        from app.services.resume_parser import resume_parser
+        threading.Thread(target=resume_parser.load_nlp_model, name="spacy-loader", daemon=True).start()
+    except ImportError as e:
+        logger.warning(f"Resume parser not available: {e}")
+    
     yield
     # Shutdown
     pass
@@ -70,7 +69,8 @@ app = FastAPI(
     title="GetPlaced API",
     description="Smart ATS analysis platform API to help you get placed in your dream job",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -82,22 +82,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (analysis and match details)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routers with error handling
 if ESSENTIAL_ROUTES_AVAILABLE:
     app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
     app.include_router(users.router, prefix="/users", tags=["Users"])
     logger.info("Essential routes (auth, users) loaded")
 
-if ROUTES_AVAILABLE:
-    try:
-        app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
-        app.include_router(resumes.router, prefix="/resumes", tags=["Resumes"])
-        app.include_router(matching.router, prefix="/matching", tags=["Matching"])
-        app.include_router(analysis.router, prefix="/analyses", tags=["Analysis"])
-        logger.info("All routes loaded successfully")
-    except Exception as e:
-        logger.warning(f"Some advanced routes not available: {e}")
-elif ADVANCED_ROUTES_AVAILABLE:
+if ADVANCED_ROUTES_AVAILABLE:
     try:
         app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
         app.include_router(resumes.router, prefix="/resumes", tags=["Resumes"])
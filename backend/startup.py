@@ -1,11 +1,50 @@
 #!/usr/bin/env python3
 """
 Lightweight startup script for Railway deployment.
-Installs ML dependencies at runtime to avoid build timeouts.
+Installs ML dependencies at runtime to avoid build timeouts. The Docker image
+installs them at build time instead, so there every package is already present.
 """
 import subprocess
 import sys
 import os
+import logging
+from logging.handlers import MemoryHandler
+import hashlib
+import importlib.util
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# Startup messages are buffered and written in one go before handing over to
+# uvicorn, rather than one unbuffered write each; errors are written at once
+log_handler = MemoryHandler(64, flushLevel=logging.ERROR, target=logging.StreamHandler(sys.stdout))
+logger = logging.getLogger("startup")
+logger.addHandler(log_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+# Quiet, non-interactive pip with bounded network waits: each connection
+# attempt times out after 20 seconds and is retried at most twice
+PIP_FLAGS = ["--disable-pip-version-check", "--no-input", "--quiet", "--prefer-binary",
+             "--retries", "2", "--timeout", "20"]
+
+# Upper bound in seconds on a whole pip run, so a stalled install cannot keep
+# the server from starting; the app runs with reduced features without it
+PIP_RUN_TIMEOUT = 180
+
+# Optional persistent directory (e.g. a mounted volume at /data/wheels) for
+# downloaded wheels and pip's HTTP cache, so later deploys install from local
+# files instead of downloading everything again
+ML_WHEEL_DIR = os.environ.get("ML_WHEEL_DIR")
+
+# Optional hash-pinned requirements file covering the ML packages and all of
+# their dependencies (e.g. from `pip-compile --generate-hashes`). When set, pip
+# installs exactly those files with --no-deps, skipping its resolver.
+ML_LOCK_FILE = os.environ.get("ML_LOCK_FILE")
+
+# Marker written once every ML package is present. While it matches the
+# package list and interpreter, warm restarts skip the import probes entirely.
+ML_READY_FILE = os.environ.get("ML_READY_FILE", os.path.join(tempfile.gettempdir(), "getplaced-ml-ready"))
 
 def install_ml_packages():
     """Install ML packages at runtime if not available."""
@@ -16,68 +55,122 @@ def install_ml_packages():
         "pandas>=1.3.0"
     ]
     
+    ready_tag = hashlib.sha1(repr((ml_packages, sys.executable)).encode()).hexdigest()
+    if read_ready_tag() == ready_tag:
+        logger.info("✓ ML packages already available")
+        return
+    
+    missing = []
     for package in ml_packages:
+        # Look up the base package name without importing (and so running) it
+        pkg_name = package.split(">=")[0].replace("-", "_")
+        if pkg_name == "scikit_learn":
+            pkg_name = "sklearn"
+        
+        if importlib.util.find_spec(pkg_name) is None:
+            missing.append(package)
+        else:
+            logger.info(f"✓ {package.split('>=' )[0]} already available")
+    
+    if not missing:
+        write_ready_tag(ready_tag)
+        return
+    
+    logger.info(f"⚠ Installing {', '.join(missing)}...")
+    if ML_WHEEL_DIR:
+        os.makedirs(ML_WHEEL_DIR, exist_ok=True)
+        # Inherited by the pip subprocesses, covering transitive dependencies too
+        os.environ.setdefault("PIP_CACHE_DIR", os.path.join(ML_WHEEL_DIR, "pip-cache"))
+    
+    with nullcontext(ML_WHEEL_DIR) if ML_WHEEL_DIR else tempfile.TemporaryDirectory() as wheel_dir:
+        if ML_LOCK_FILE:
+            # Everything is already resolved and pinned
+            install_args = ["--no-deps", "--require-hashes", "--requirement", ML_LOCK_FILE]
+        else:
+            download_wheels(missing, wheel_dir)
+            # A single pip run pays interpreter and resolver startup once and
+            # solves all missing packages as one dependency graph, taking the
+            # downloaded wheels from the local directory
+            install_args = ["--find-links", wheel_dir, *missing]
+        
         try:
-            # Try to import the base package name
-            pkg_name = package.split(">=")[0].replace("-", "_")
-            if pkg_name == "scikit_learn":
-                pkg_name = "sklearn"
-            
-            __import__(pkg_name)
-            print(f"✓ {package.split('>=' )[0]} already available")
-        except ImportError:
-            print(f"⚠ Installing {package}...")
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", package], 
-                             check=True, capture_output=True, text=True)
-                print(f"✓ {package} installed successfully")
-            except subprocess.CalledProcessError as e:
-                print(f"✗ Failed to install {package}: {e}")
+            subprocess.run([sys.executable, "-m", "pip", "install", *PIP_FLAGS, *install_args],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                           timeout=PIP_RUN_TIMEOUT)
+            logger.info(f"✓ {', '.join(missing)} installed successfully")
+            write_ready_tag(ready_tag)
+        except subprocess.TimeoutExpired:
+            logger.error(f"✗ Installing {', '.join(missing)} timed out after {PIP_RUN_TIMEOUT}s, "
+                         f"starting without them")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"✗ Failed to install {', '.join(missing)}: {e}\n{e.stderr}")
+
+def read_ready_tag():
+    """Return the tag stored in the ML ready marker, or None if there is none."""
+    try:
+        with open(ML_READY_FILE) as marker:
+            return marker.read().strip()
+    except OSError:
+        return None
 
-def download_spacy_model():
-    """Download spaCy model if available."""
+def write_ready_tag(tag):
+    """Record that the ML packages identified by the tag are installed."""
     try:
-        import spacy
+        with open(ML_READY_FILE, "w") as marker:
+            marker.write(tag)
+    except OSError as e:
+        logger.warning(f"⚠ Could not write {ML_READY_FILE}: {e}")
+
+def download_wheels(packages, wheel_dir):
+    """Download the packages' own wheels in parallel, one pip process each.
+    
+    pip downloads sequentially, so fetching the large top-level wheels
+    concurrently overlaps their network time. Failures are ignored: the
+    install step falls back to the package index for anything missing.
+    Wheels already in a persistent wheel directory are not downloaded again.
+    """
+    def download(package):
         try:
-            nlp = spacy.load("en_core_web_sm")
-            print("✓ spaCy model 'en_core_web_sm' is available")
-            return True
-        except OSError:
-            print("⚠ Downloading spaCy model...")
-            try:
-                subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], 
-                             check=True, capture_output=True, text=True, timeout=60)
-                print("✓ spaCy model downloaded successfully")
-                return True
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                print("⚠ Could not download spaCy model, will use fallback")
-                return False
-    except ImportError:
-        print("⚠ spaCy not available, will use fallback parsing")
-        return False
+            subprocess.run([sys.executable, "-m", "pip", "download", *PIP_FLAGS,
+                            "--no-deps", "--dest", wheel_dir, package],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=PIP_RUN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            pass
+    
+    with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+        list(executor.map(download, packages))
 
 def main():
     """Main startup function."""
-    print("🚀 Starting GetPlaced API...")
+    logger.info("🚀 Starting GetPlaced API...")
     
-    # Install ML packages at runtime
-    install_ml_packages()
+    # Install ML packages at runtime, unless the environment already provides
+    # them (local development, or an image with them baked in)
+    if os.environ.get("INSTALL_ML_AT_STARTUP", "1") == "1":
+        install_ml_packages()
     
-    # Try to download spaCy model (non-blocking)
-    download_spacy_model()
+    # --check-only prepares the dependencies and exits without starting the
+    # server, e.g. as a release step that warms the ready marker and caches
+    if "--check-only" in sys.argv[1:]:
+        log_handler.flush()
+        return
     
-    # Start the application
+    # Start the application. The app loads the spaCy model (downloading it if
+    # missing) in the background, so the port opens without waiting for it.
     port = int(os.environ.get("PORT", 8000))
-    print(f"🌐 Starting server on port {port}")
+    logger.info(f"🌐 Starting server on port {port}")
     
-    # Import and run uvicorn directly
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        log_level="info"
-    )
+    # Replace this process with uvicorn so none of the installer's state stays
+    # resident for the server's lifetime; flush first, as exec discards buffers
+    log_handler.flush()
+    sys.stdout.flush()
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "0.0.0.0",
+        "--port", str(port),
+        "--log-level", "info"
+    ])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
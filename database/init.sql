@@ -3,17 +3,35 @@
 -- Create extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Add columns introduced after the tables were first created
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS upload_key VARCHAR(64);
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS experience_count INTEGER;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS education_count INTEGER;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS certification_count INTEGER;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE job_matches ADD COLUMN IF NOT EXISTS job_version INTEGER;
+ALTER TABLE job_matches ADD COLUMN IF NOT EXISTS resume_version INTEGER;
+
 -- Create indexes for better performance
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_title ON jobs(title);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_company ON jobs(company);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active ON jobs(is_active);
-CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_user ON resumes(user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_resumes_user_id_id ON resumes(user_id, id);
+ALTER TABLE resumes ALTER COLUMN skills TYPE jsonb USING skills::jsonb;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_resumes_skills ON resumes USING gin(skills);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_resumes_content_hash ON resumes(content_hash);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_resumes_user_id_upload_key ON resumes(user_id, upload_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_analyses_user_id_created_at ON analyses(user_id, created_at DESC);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_applications_job ON applications(job_id);
-CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_applications_user ON applications(user_id);
-CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_job_matches_job ON job_matches(job_id);
-CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_job_matches_user ON job_matches(user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_applications_user_id_job_id ON applications(user_id, job_id);
+DELETE FROM job_matches WHERE id NOT IN (SELECT max(id) FROM job_matches GROUP BY job_id, user_id, resume_id);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_job_matches_job_user_resume ON job_matches(job_id, user_id, resume_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_job_matches_job_id_overall_score ON job_matches(job_id, overall_score DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_job_matches_user_id_resume_id ON job_matches(user_id, resume_id);
 
 -- Insert sample data
 INSERT INTO users (email, hashed_password, full_name, role, is_active, is_verified) VALUES
@@ -52,5 +70,5 @@ INSERT INTO jobs (title, company, description, requirements, location, job_type,
 );
 
 -- Create full-text search indexes for better searching
-CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_search ON jobs USING gin(to_tsvector('english', title || ' ' || description || ' ' || requirements));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_search ON jobs USING gin(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(company, '') || ' ' || coalesce(description, '')));
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_search ON resumes USING gin(to_tsvector('english', coalesce(raw_text, '')));
\ No newline at end of file